@@ -1,12 +1,17 @@
+import os
 import signal
-
-import dbus
-
-from .support.Switch import load_switches
-from .support.Device import load_devices
-from .support.config import load_config
+import logging
+
+import startup
+from state import State
+from .support.Switch import start_switches
+from .support import snapshot
+from .support.metrics import metrics
+from .support.tracing import tracer
 from .ui.Main import Main
 
+log = logging.getLogger(__name__)
+
 root = None  # type: Main
 
 
@@ -15,21 +20,43 @@ def on_quit(signum: int, frame) -> None:
     root.destroy()
 
 
+# noinspection PyUnusedLocal
+def on_dump_trace(signum: int, frame) -> None:
+    path = os.path.join(State.current.cache_dir, "trace.json")
+    try:
+        tracer.dump(path)
+        log.info("Trace written to `{0}`".format(path))
+    except OSError as e:
+        log.warning("Failed to write the trace to `{0}`: {1}".format(path, e))
+
+
 def main() -> None:
     global root
 
-    config = load_config()
-    load_switches(config['switches'])
-    load_devices(config['devices'])
+    with startup.profile.phase("load configuration"):
+        snapshot.load()
+    start_switches()
+    metrics.start(os.path.join(State.current.cache_dir, "metrics.prom"))
 
     signal.signal(signal.SIGTERM, on_quit)
+    signal.signal(signal.SIGUSR1, on_dump_trace)
+
+    with startup.profile.phase("create window"):
+        root = Main()
 
-    root = Main()
+    root.after_idle(on_first_frame)
     root.mainloop()
 
 
+def on_first_frame() -> None:
+    startup.profile.mark("first frame")
+    startup.profile.report()
+
+
 # noinspection SpellCheckingInspection
 def shutdown() -> None:
+    import dbus
+
     bus = dbus.SystemBus()
     kit = bus.get_object("org.freedesktop.login1", "/org/freedesktop/login1")
     manager = dbus.Interface(kit, "org.freedesktop.login1.Manager")
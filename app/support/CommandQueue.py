@@ -0,0 +1,137 @@
+from typing import Any, Callable, Hashable, List, Tuple, Union
+from collections import OrderedDict
+from concurrent.futures import Future
+import threading
+
+from .tracing import tracer, Span
+
+# Runs a batch of queued items together.
+BatchHandler = Callable[[List[Any]], None]
+
+
+class CommandQueue:
+    """
+    Runs the commands for one switch, in order, on a dedicated thread.  A command submitted while another command with
+    the same key is still waiting supersedes it, the waiting command is dropped and its future cancelled, so only the
+    latest intent is ever sent to the hardware.  Batched items waiting next to each other are handed to the batch
+    handler together, so they can be sent to the switch at once.
+    """
+
+    def __init__(self, name: str, batch_handler: Union[None, BatchHandler] = None):
+        """
+        Initializes a new instance of the CommandQueue class.
+        :param name:          The name of the queue, for the worker thread.
+        :param batch_handler: Runs the items submitted with `submit_batched`.
+        """
+        self.name = name
+        self.__batch_handler = batch_handler
+        self.__condition = threading.Condition()
+        self.__pending = OrderedDict()  # type: OrderedDict[Hashable, Tuple[bool, Any, Future, Union[None, Span]]]
+        self.__stopped = False
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="switch-{0}".format(name))
+        self.__thread.start()
+
+    def submit(self, key: Hashable, command: Callable[[], Any]) -> Future:
+        """
+        Queues a command, superseding any waiting command with the same key.
+        :param key:     Identifies what the command affects, such as an output channel.
+        :param command: The command to run.
+        :return: A future for the result of the command.
+        """
+        with self.__condition:
+            return self.__enqueue(key, False, command)
+
+    def submit_batched(self, items: List[Tuple[Hashable, Any]]) -> List[Future]:
+        """
+        Queues items for the batch handler, superseding any waiting command or item with the same key.
+        :param items: The key and item pairs, queued together so they will be in the same batch.
+        :return: A future for each item.
+        """
+        with self.__condition:
+            return [self.__enqueue(key, True, item) for key, item in items]
+
+    def stop(self) -> None:
+        """Stops the worker after any queued commands, anything submitted afterward fails."""
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify()
+
+    def __enqueue(self, key: Hashable, batched: bool, work: Any) -> Future:
+        """
+        Queues work, the condition must be held.
+        :param key:     Identifies what the work affects.
+        :param batched: Indicates whether the work is an item for the batch handler or a command.
+        :param work:    The command or item.
+        :return: A future for the result of the work, failed if the queue was stopped.
+        """
+        future = Future()
+        if self.__stopped:
+            # Nothing would ever run it.
+            future.set_running_or_notify_cancel()
+            future.set_exception(RuntimeError("Command queue `{0}` is stopped".format(self.name)))
+            return future
+
+        if key in self.__pending:
+            superseded = self.__pending.pop(key)[2]
+            superseded.cancel()
+
+        # The work is part of whatever the submitting thread is doing, such as a selection.
+        self.__pending[key] = (batched, work, future, tracer.current())
+        self.__condition.notify()
+        return future
+
+    def __run(self) -> None:
+        """Runs queued commands until stopped."""
+        while True:
+            with self.__condition:
+                while len(self.__pending) == 0:
+                    if self.__stopped:
+                        return
+                    self.__condition.wait()
+
+                batched, work, future, parent = self.__pending.popitem(last=False)[1]
+                if batched:
+                    # Take every batched item waiting right behind this one, commands must still run in order.
+                    batch = [(work, future)]
+                    while len(self.__pending) > 0 and next(iter(self.__pending.values()))[0]:
+                        batch.append(self.__pending.popitem(last=False)[1][1:3])
+
+            with tracer.resume(parent):
+                if batched:
+                    self.__run_batch(batch)
+                else:
+                    self.__run_command(work, future)
+
+    @staticmethod
+    def __run_command(command: Callable[[], Any], future: Future) -> None:
+        """
+        Runs a command.
+        :param command: The command to run.
+        :param future:  The future for the result of the command.
+        """
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            future.set_result(command())
+        except Exception as e:
+            future.set_exception(e)
+
+    def __run_batch(self, batch: List[Tuple[Any, Future]]) -> None:
+        """
+        Runs a batch of items.
+        :param batch: The items and their futures.
+        """
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if len(batch) == 0:
+            return
+
+        try:
+            self.__batch_handler([item for item, future in batch])
+        except Exception as e:
+            for item, future in batch:
+                future.set_exception(e)
+            return
+
+        for item, future in batch:
+            future.set_result(None)
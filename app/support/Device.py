@@ -1,6 +1,9 @@
-from typing import Dict, Any, Union, List
+from typing import Dict, Any, Union, List, Tuple
+from concurrent.futures import Future
 
-from .Tie import Tie
+from .Tie import Tie, CompiledTie
+from .Dispatcher import dispatcher, TieResult
+from .RoutingPlan import RoutingPlan
 from .config import get_config_path
 from .validation import validate_value
 
@@ -8,6 +11,9 @@ from .validation import validate_value
 TieChannel = Union[int, Dict[str, int]]
 TieConfig = Dict[str, TieChannel]
 
+# A validated device, the title, absolute image path, and compiled ties.
+CompiledDevice = Tuple[str, str, List[CompiledTie]]
+
 
 class Device:
     """Represents an input device."""
@@ -27,19 +33,78 @@ class Device:
         self.ties = []  # type: List[Tie]
 
         self.__load_tie(config['ties'])
+        self.plan = RoutingPlan(self.ties)
+
+    @property
+    def ready(self) -> bool:
+        """Determines whether all the switches used by the device have started."""
+        return all(tie.switch.ready for tie in self.ties)
 
-    def select(self) -> None:
-        """Connect channel ties to select the device."""
-        for tie in self.ties:
-            tie.switch.set_tie(tie.input, tie.output['video'], tie.output['audio'])
+    def select(self) -> List[TieResult]:
+        """
+        Connect channel ties to select the device, on all switches at once.
+        :return: The result of each tie.
+        :raises DispatchError: If any tie failed.
+        """
+        return dispatcher.execute(self.plan).result()
 
-    def __load_tie(self, switch_ties: Dict[str, TieConfig]) -> None:
+    def queue_select(self) -> Future:
+        """
+        Queues the channel ties to select the device, without waiting on the switches.
+        :return: A future for the result of each tie, ties superseded by a later selection are marked as such.
+        """
+        return dispatcher.execute(self.plan)
+
+    def compile(self) -> CompiledDevice:
+        """
+        Gets the validated device in a form that can be saved, and restored without validating it again.
+        :return: The compiled device.
+        """
+        return self.title, self.image, [tie.compile() for tie in self.ties]
+
+    @staticmethod
+    def restore(device_index: int, compiled: CompiledDevice):
+        """
+        Restores a compiled device.
+        :param device_index: The device index.
+        :param compiled:     The compiled device.
+        :return: The device.
+        :rtype: Device
+        """
+        title, image, ties = compiled
+
+        device = Device.__new__(Device)
+        device.id = device_index
+        device.title = title
+        device.image = image
+        device.ties = [Tie.restore(tie) for tie in ties]
+        device.plan = RoutingPlan(device.ties)
+        return device
+
+    def __load_tie(self, switch_ties: Dict[str, Union[TieConfig, List[TieConfig]]]) -> None:
         """
         Loads the ties for a switch.
-        :param switch_ties: The tie configuration.
+        :param switch_ties: The tie configuration, a switch may be given a list of ties to set several outputs.
         """
         for switch_id, tie_config in switch_ties.items():
-            self.ties.append(Tie(switch_id, tie_config))
+            if isinstance(tie_config, list):
+                validate_value(len(tie_config) > 0, "No ties given for `{0}`".format(switch_id))
+                for output_tie_config in tie_config:
+                    self.__add_tie(Tie(switch_id, output_tie_config))
+            else:
+                self.__add_tie(Tie(switch_id, tie_config))
+
+    def __add_tie(self, tie: Tie) -> None:
+        """
+        Adds a tie, unless the device already has a tie for the same outputs, which would supersede it.
+        :param tie: The tie.
+        """
+        outputs = (int(tie.output['video']), int(tie.output['audio']))
+        validate_value(all(other.switch is not tie.switch or
+                           (int(other.output['video']), int(other.output['audio'])) != outputs for other in self.ties),
+                       "More than one tie given for video output {0} and audio output {1} of `{2}`".format(
+                           outputs[0], outputs[1], tie.switch.id))
+        self.ties.append(tie)
 
 
 # The loaded devices.
@@ -55,3 +120,12 @@ def load_devices(config: List[Dict[str, Any]]) -> None:
     for device_config in config:
         devices.append(Device(index, device_config))
         index = index + 1
+
+
+def restore_devices(compiled: List[CompiledDevice]) -> None:
+    """
+    Restores the devices from their compiled form.
+    :param compiled: The compiled devices.
+    """
+    for index, compiled_device in enumerate(compiled):
+        devices.append(Device.restore(index, compiled_device))
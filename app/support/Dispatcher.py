@@ -0,0 +1,113 @@
+from typing import List, Union
+from concurrent.futures import Future, CancelledError
+import threading
+import logging
+
+from .Tie import Tie
+from .RoutingPlan import RoutingPlan
+from .tracing import tracer
+
+log = logging.getLogger(__name__)
+
+
+class TieResult:
+    """The outcome of sending a tie to its switch."""
+
+    def __init__(self, tie: Tie, error: Union[None, Exception] = None, superseded: bool = False):
+        """
+        Initializes a new instance of the TieResult class.
+        :param tie:        The tie that was sent.
+        :param error:      The error raised by the switch, if the tie failed.
+        :param superseded: Indicates the tie was dropped in favour of a newer tie for the same outputs.
+        """
+        self.tie = tie
+        self.error = error
+        self.superseded = superseded
+
+    @property
+    def succeeded(self) -> bool:
+        """Determines whether the tie was applied or superseded without error."""
+        return self.error is None
+
+
+class DispatchError(Exception):
+    """Raised when one or more ties of a selection failed."""
+
+    def __init__(self, results: List[TieResult]):
+        """
+        Initializes a new instance of the DispatchError class.
+        :param results: The results of every tie in the selection.
+        """
+        self.results = results
+        failures = ["`{0}`: {1}".format(result.tie.switch.id, result.error)
+                    for result in results if not result.succeeded]
+        super().__init__("Failed to set ties on {0}".format(", ".join(failures)))
+
+
+class Dispatcher:
+    """
+    Sends ties to their switches concurrently.  Each switch has its own command queue, so the ties for any one switch
+    stay in order while the switches themselves work in parallel.
+    """
+
+    def execute(self, plan: RoutingPlan) -> Future:
+        """
+        Queues the ties of a routing plan on their switches without waiting.
+        :param plan: The routing plan.
+        :return: A future for the result of each tie, grouped by switch; it fails with a `DispatchError` if any tie
+                 failed.
+        """
+        ties = plan.ties
+        futures = []  # type: List[Future]
+        with tracer.span("dispatch", "switch", {"ties": len(ties)}):
+            for switch, switch_ties, switch_channels in plan.groups:
+                futures.extend(switch.queue_ties(switch_channels))
+
+        selection = Future()
+        selection.set_running_or_notify_cancel()
+        if len(futures) == 0:
+            selection.set_result([])
+            return selection
+
+        lock = threading.Lock()
+        remaining = [len(futures)]
+
+        # noinspection PyUnusedLocal
+        def on_done(future: Future) -> None:
+            with lock:
+                remaining[0] = remaining[0] - 1
+                if remaining[0] > 0:
+                    return
+
+            results = [Dispatcher.__result(tie, tie_future) for tie, tie_future in zip(ties, futures)]
+            if all(result.succeeded for result in results):
+                selection.set_result(results)
+            else:
+                selection.set_exception(DispatchError(results))
+
+        for tie_future in futures:
+            tie_future.add_done_callback(on_done)
+
+        return selection
+
+    @staticmethod
+    def __result(tie: Tie, future: Future) -> TieResult:
+        """
+        Gets the result of a completed tie.
+        :param tie:    The tie that was sent.
+        :param future: The completed future of the tie.
+        :return: The result of the tie.
+        """
+        try:
+            future.result()
+            return TieResult(tie)
+        except CancelledError:
+            return TieResult(tie, superseded=True)
+        except Exception as e:
+            log.error("Failed to set tie on `{0}`".format(tie.switch.id))
+            log.exception(e)
+            return TieResult(tie, e)
+
+
+# The shared dispatcher.
+dispatcher = Dispatcher()
@@ -1,4 +1,9 @@
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, List, Tuple, Union
+
+from .aio import event_loop
+
+# The input, video output, and audio output channels of a tie.
+ChannelTie = Tuple[int, int, int]
 
 
 class Driver:
@@ -15,6 +20,38 @@ class Driver:
         """
         self.config = config
         self.capabilities = capabilities
+        self.reset_listeners = []  # type: List[Callable[[], None]]
+        self.__bytes_written = 0
+
+    @property
+    def bytes_written(self) -> int:
+        """Gets the number of bytes written to the switch or monitor."""
+        return self.__bytes_written
+
+    def count_written(self, size: int) -> None:
+        """
+        Counts bytes written to the switch or monitor, for the metrics.
+        :param size: The number of bytes written.
+        """
+        self.__bytes_written = self.__bytes_written + size
+
+    def open(self) -> None:
+        """
+        Opens the connection to the switch or monitor, which may block, so the constructor need not.  It is called
+        before any command, and again if it failed.
+        """
+        pass
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and prepares anything needed to send it, such as its encoded command.  It is called once for
+        each tie in the configuration as it is loaded, so that setting the tie later need not do either.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :raises ValueError: If the tie is not valid for the switch.
+        """
+        pass
 
     def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
         """
@@ -25,6 +62,14 @@ class Driver:
         """
         pass
 
+    def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties, drivers that can send them at once should override this.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        for tie in ties:
+            self.set_tie(*tie)
+
     def power_on(self) -> None:
         """Power on the switch or monitor."""
         pass
@@ -33,15 +78,159 @@ class Driver:
         """Powers off the switch or monitor."""
         pass
 
+    def close(self) -> None:
+        """Closes any connection to the switch or monitor, it may be opened again by `open`."""
+        pass
+
+    def notify_reset(self) -> None:
+        """Notifies listeners that the connection to the switch was re-established, so its state may have changed."""
+        for listener in self.reset_listeners:
+            listener()
+
+
+class AsyncDriver:
+    """
+    Represents the traits and functionality of an asynchronous switch driver.  All methods other than the constructor
+    must be called from the shared event loop, and the constructor must not perform any I/O.
+    """
+
+    def __init__(self, config: Dict[str, Any], capabilities: int):
+        """
+        Initializes a new instance of the AsyncDriver class.
+        :param config:       The device configuration for the driver.
+        :param capabilities: The capabilities of the driver.
+        """
+        self.config = config
+        self.capabilities = capabilities
+        self.reset_listeners = []  # type: List[Callable[[], None]]
+        self.__bytes_written = 0
+
+    @property
+    def bytes_written(self) -> int:
+        """Gets the number of bytes written to the switch or monitor."""
+        return self.__bytes_written
+
+    def count_written(self, size: int) -> None:
+        """
+        Counts bytes written to the switch or monitor, for the metrics.
+        :param size: The number of bytes written.
+        """
+        self.__bytes_written = self.__bytes_written + size
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and prepares anything needed to send it, such as its encoded command.  Unlike the other
+        methods, it is called from the thread loading the configuration, once for each tie, so it must not perform any
+        I/O.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :raises ValueError: If the tie is not valid for the switch.
+        """
+        pass
+
+    async def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Sets input and output ties.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        pass
+
+    async def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties, drivers that can send them at once should override this.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        for tie in ties:
+            await self.set_tie(*tie)
+
+    async def power_on(self) -> None:
+        """Power on the switch or monitor."""
+        pass
+
+    async def power_off(self) -> None:
+        """Powers off the switch or monitor."""
+        pass
+
+    async def close(self) -> None:
+        """Closes any connection to the switch or monitor."""
+        pass
+
+    def notify_reset(self) -> None:
+        """Notifies listeners that the connection to the switch was re-established, so its state may have changed."""
+        for listener in self.reset_listeners:
+            listener()
+
+
+class SyncDriverShim(Driver):
+    """Exposes an asynchronous driver through the blocking driver API by running it on the shared event loop."""
+
+    def __init__(self, driver: AsyncDriver):
+        """
+        Initializes a new instance of the SyncDriverShim class.
+        :param driver: The asynchronous driver.
+        """
+        super().__init__(driver.config, driver.capabilities)
+        self.driver = driver
+        self.driver.reset_listeners.append(self.notify_reset)
+
+    @property
+    def bytes_written(self) -> int:
+        """Gets the number of bytes written to the switch or monitor by the asynchronous driver."""
+        return self.driver.bytes_written
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and prepares anything needed to send it.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :raises ValueError: If the tie is not valid for the switch.
+        """
+        self.driver.prepare_tie(input_channel, video_output_channel, audio_output_channel)
+
+    def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Sets input and output ties.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        event_loop.run(self.driver.set_tie(input_channel, video_output_channel, audio_output_channel))
+
+    def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        event_loop.run(self.driver.set_ties(ties))
+
+    def power_on(self) -> None:
+        """Power on the switch or monitor."""
+        event_loop.run(self.driver.power_on())
+
+    def power_off(self) -> None:
+        """Powers off the switch or monitor."""
+        event_loop.run(self.driver.power_off())
+
+    def close(self) -> None:
+        """Closes any connection to the switch or monitor."""
+        event_loop.run(self.driver.close())
+
 
 class DriverRegistration:
-    def __init__(self, driver_id: str, title: str, ctor: Callable[[Dict[str, Any]], Driver]):
+    def __init__(self, driver_id: str, title: str, ctor: Callable[[Dict[str, Any]], Driver],
+                 async_ctor: Union[None, Callable[[Dict[str, Any]], AsyncDriver]] = None):
         """
         Defined basic information about a registered driver.
-        :param driver_id: The key used to identify the driver.
-        :param title:     The title of the driver.
-        :param ctor:      The constructor callable for the driver.
+        :param driver_id:  The key used to identify the driver.
+        :param title:      The title of the driver.
+        :param ctor:       The constructor callable for the driver.
+        :param async_ctor: The constructor callable for the asynchronous variant of the driver, if it has one.
         """
         self.id = driver_id
         self.title = title
         self.ctor = ctor
+        self.async_ctor = async_ctor
@@ -0,0 +1,31 @@
+from typing import Iterable, List, Tuple
+from collections import OrderedDict
+
+from .Driver import ChannelTie
+from .Switch import Switch
+from .Tie import Tie
+
+
+class RoutingPlan:
+    """
+    The ties of a selection, grouped by switch, with their channels validated and their commands prepared by the
+    drivers once as the plan is made, so that carrying out the plan only has to queue the ties.
+    """
+
+    def __init__(self, ties: Iterable[Tie]):
+        """
+        Initializes a new instance of the RoutingPlan class.
+        :param ties: The ties of the selection.
+        :raises ValueError: If a tie is not valid for its switch.
+        """
+        # Group the ties by switch, so each switch gets all of its ties in one batch.
+        groups = OrderedDict()  # type: OrderedDict[str, Tuple[Switch, List[Tie], List[ChannelTie]]]
+        for tie in ties:
+            channels = (tie.input, int(tie.output['video']), int(tie.output['audio']))  # type: ChannelTie
+            tie.switch.driver.prepare_tie(*channels)
+            switch, switch_ties, switch_channels = groups.setdefault(tie.switch.id, (tie.switch, [], []))
+            switch_ties.append(tie)
+            switch_channels.append(channels)
+
+        self.groups = list(groups.values())  # type: List[Tuple[Switch, List[Tie], List[ChannelTie]]]
+        self.ties = [tie for switch, switch_ties, switch_channels in self.groups for tie in switch_ties]
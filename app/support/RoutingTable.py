@@ -0,0 +1,41 @@
+from typing import Dict
+import threading
+
+
+class RoutingTable:
+    """Remembers the input last confirmed on each output of a switch, so ties already in place need not be resent."""
+
+    def __init__(self):
+        """Initializes a new instance of the RoutingTable class."""
+        self.__lock = threading.Lock()
+        self.__video = {}  # type: Dict[int, int]
+        self.__audio = {}  # type: Dict[int, int]
+
+    def is_routed(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> bool:
+        """
+        Determines whether a tie is already in place.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :return: True if both outputs are known to be on the input; otherwise, False.
+        """
+        with self.__lock:
+            return (self.__video.get(video_output_channel) == input_channel and
+                    self.__audio.get(audio_output_channel) == input_channel)
+
+    def record(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Records a tie confirmed by the switch.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        with self.__lock:
+            self.__video[video_output_channel] = input_channel
+            self.__audio[audio_output_channel] = input_channel
+
+    def invalidate(self) -> None:
+        """Forgets all ties, such as when the switch state can no longer be trusted."""
+        with self.__lock:
+            self.__video.clear()
+            self.__audio.clear()
@@ -1,7 +1,17 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
+from concurrent.futures import Future
+import threading
+import logging
 
+from .Driver import ChannelTie
 from .validation import validate_value
 from .drivers import load_driver
+from .CommandQueue import CommandQueue
+from .RoutingTable import RoutingTable
+from .metrics import metrics
+from .tracing import tracer
+
+log = logging.getLogger(__name__)
 
 
 class Switch:
@@ -18,25 +28,142 @@ class Switch:
                      "Configuration block for `{0}` is not an object".format(switch_id))
 
         self.id = switch_id
+        self.config = config
         self.title = str(config['title'] if 'title' in config else switch_id)
         self.driver = load_driver(switch_id, config)
+        self.lock = threading.RLock()  # Serializes commands, since they may come from several threads.
+        self.queue = CommandQueue(switch_id, self.set_ties)
+        self.routes = RoutingTable()
+        self.metrics = metrics.get(switch_id)
+        self.driver.reset_listeners.append(self.routes.invalidate)
+        self.__opened = False
+        self.__started = None  # type: Union[None, Future]
+
+    @property
+    def ready(self) -> bool:
+        """Determines whether the switch has finished starting, if it could not be opened it will be tried again."""
+        return self.__started is not None and self.__started.done()
+
+    def start(self) -> None:
+        """Opens and then powers on the switch or monitor in the background, on its command queue."""
+        self.__started = self.queue.submit('open', self.open)
+        self.__started.add_done_callback(self.__on_started)
+        self.queue_power_on()
+
+    def open(self) -> None:
+        """Opens the connection to the switch or monitor, if not already open."""
+        with self.lock:
+            if not self.__opened:
+                self.driver.open()
+                self.__opened = True
+
+    def close(self) -> Future:
+        """
+        Closes the switch once any queued commands are done, it may not be used afterward.
+        :return: A future for closing the switch.
+        """
+        self.driver.reset_listeners.remove(self.routes.invalidate)
+        closed = self.queue.submit('close', self.__close)
+        self.queue.stop()
+        return closed
 
     def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
         """
-        Sets input and output ties.
+        Sets input and output ties, unless the switch already has them.
         :param input_channel:        The input channel of the tie.
         :param video_output_channel: The output video channel of the tie.
         :param audio_output_channel: The output audio channel of the tie.
         """
-        self.driver.set_tie(input_channel, video_output_channel, audio_output_channel)
+        self.set_ties([(input_channel, video_output_channel, audio_output_channel)])
+
+    def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties at once, skipping any the switch already has.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        with self.lock, tracer.span("tie", "switch", {"switch": self.id, "ties": len(ties)}) as span:
+            changed = [tie for tie in ties if not self.routes.is_routed(*tie)]
+            span.args["changed"] = len(changed)
+            if len(changed) == 0:
+                return
+
+            self.open()
+            try:
+                with self.metrics.measure('tie', self.driver):
+                    if len(changed) == 1:
+                        self.driver.set_tie(*changed[0])
+                    else:
+                        self.driver.set_ties(changed)
+            except Exception:
+                # We no longer know what the switch has.
+                self.routes.invalidate()
+                raise
+
+            for tie in changed:
+                self.routes.record(*tie)
 
     def power_on(self) -> None:
         """Powers on the switch or monitor."""
-        self.driver.power_on()
+        with self.lock:
+            self.open()
+            self.routes.invalidate()
+            with self.metrics.measure('power_on', self.driver):
+                self.driver.power_on()
 
     def power_off(self) -> None:
         """Powers off the switch or monitor."""
-        self.driver.power_off()
+        with self.lock:
+            self.open()
+            self.routes.invalidate()
+            with self.metrics.measure('power_off', self.driver):
+                self.driver.power_off()
+
+    def queue_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> Future:
+        """
+        Queues setting input and output ties, superseding any waiting tie for the same outputs.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :return: A future for the tie, cancelled if superseded.
+        """
+        return self.queue_ties([(input_channel, video_output_channel, audio_output_channel)])[0]
+
+    def queue_ties(self, ties: List[ChannelTie]) -> List[Future]:
+        """
+        Queues setting several input and output ties, to be sent together, superseding any waiting tie for the same
+        outputs.
+        :param ties: The input, video output, and audio output channels of each tie.
+        :return: A future for each tie, cancelled if superseded.
+        """
+        return self.queue.submit_batched([(('tie', tie[1], tie[2]), tie) for tie in ties])
+
+    def queue_power_on(self) -> Future:
+        """
+        Queues powering on the switch or monitor, superseding any waiting power command.
+        :return: A future for the command, cancelled if superseded.
+        """
+        return self.queue.submit('power', self.power_on)
+
+    def queue_power_off(self) -> Future:
+        """
+        Queues powering off the switch or monitor, superseding any waiting power command.
+        :return: A future for the command, cancelled if superseded.
+        """
+        return self.queue.submit('power', self.power_off)
+
+    def __close(self) -> None:
+        """Closes the connection to the switch or monitor."""
+        with self.lock:
+            self.driver.close()
+            self.__opened = False
+
+    def __on_started(self, future: Future) -> None:
+        """
+        Reports a switch that could not be opened.
+        :param future: The future for opening the switch.
+        """
+        if not future.cancelled() and future.exception() is not None:
+            log.error("Failed to open `{0}`: {1}".format(self.title, future.exception()))
 
 
 # The loaded switches.
@@ -50,3 +177,9 @@ def load_switches(config: Dict[str, Dict[str, Any]]) -> None:
     """
     for switch_id, switch_config in config.items():
         switches[switch_id] = Switch(switch_id, switch_config)
+
+
+def start_switches() -> None:
+    """Starts all the switches at once, each is opened and powered on in the background."""
+    for switch in switches.values():
+        switch.start()
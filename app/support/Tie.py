@@ -1,4 +1,4 @@
-from typing import Dict, Union
+from typing import Dict, Tuple, Union
 
 from .validation import validate_value
 from . import Switch, Driver
@@ -11,6 +11,9 @@ TieConfig = Dict[str, TieChannel]
 # A hard output channel set.
 TieOutput = Dict[str, int]
 
+# A validated tie, the switch identifier, and the input, video output, and audio output channels.
+CompiledTie = Tuple[str, int, int, int]
+
 
 class Tie:
     """Represents a channel tie for input and output."""
@@ -42,3 +45,27 @@ class Tie:
                 self.output = output
             elif isinstance(output, int):
                 self.output = {"video": output, "audio": output}
+
+    def compile(self) -> CompiledTie:
+        """
+        Gets the validated tie in a form that can be saved, and restored without validating it again.
+        :return: The compiled tie.
+        """
+        return self.switch.id, self.input, int(self.output['video']), int(self.output['audio'])
+
+    @staticmethod
+    def restore(compiled: CompiledTie):
+        """
+        Restores a compiled tie.
+        :param compiled: The compiled tie.
+        :return: The tie.
+        :rtype: Tie
+        """
+        switch_id, input_channel, video_output_channel, audio_output_channel = compiled
+        validate_value(switch_id in switches, "No such switch `{0}`".format(switch_id))
+
+        tie = Tie.__new__(Tie)
+        tie.switch = switches[switch_id]
+        tie.input = input_channel
+        tie.output = {"video": video_output_channel, "audio": audio_output_channel}
+        return tie
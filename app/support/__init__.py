@@ -1,4 +1,5 @@
-from .Driver import Driver, DriverRegistration
+from .Driver import Driver, AsyncDriver, SyncDriverShim, DriverRegistration
 from .Switch import Switch
 from .Tie import Tie
+from .Dispatcher import Dispatcher, DispatchError, TieResult
 from .Device import Device
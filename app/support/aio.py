@@ -0,0 +1,61 @@
+from typing import Any, Awaitable, Union
+import concurrent.futures
+import threading
+
+from .tracing import tracer, Span
+
+
+class EventLoopThread:
+    """Runs a single asyncio event loop on a background thread, shared by all the asynchronous drivers."""
+
+    def __init__(self):
+        """Initializes a new instance of the EventLoopThread class, the loop is started on first use."""
+        self.__lock = threading.Lock()
+        self.__loop = None  # type: Union[None, asyncio.AbstractEventLoop]
+
+    @property
+    def loop(self) -> 'asyncio.AbstractEventLoop':
+        """Gets the event loop, starting it if needed."""
+        # Only the asynchronous drivers need asyncio, so it is not imported until one is used.
+        import asyncio
+
+        with self.__lock:
+            if self.__loop is None:
+                self.__loop = asyncio.new_event_loop()
+                threading.Thread(target=self.__loop.run_forever, daemon=True, name="event-loop").start()
+
+            return self.__loop
+
+    def submit(self, coroutine: Awaitable[Any]) -> concurrent.futures.Future:
+        """
+        Schedules a coroutine on the event loop.
+        :param coroutine: The coroutine to run.
+        :return: A future for the result of the coroutine.
+        """
+        import asyncio
+
+        # The coroutine is part of whatever the submitting thread is doing, such as setting a tie.
+        return asyncio.run_coroutine_threadsafe(EventLoopThread.__resume(tracer.current(), coroutine), self.loop)
+
+    def run(self, coroutine: Awaitable[Any]) -> Any:
+        """
+        Runs a coroutine on the event loop and waits on it, this must not be called from the event loop.
+        :param coroutine: The coroutine to run.
+        :return: The result of the coroutine.
+        """
+        return self.submit(coroutine).result()
+
+    @staticmethod
+    async def __resume(parent: Union[None, Span], coroutine: Awaitable[Any]) -> Any:
+        """
+        Runs a coroutine as part of a span from another thread.
+        :param parent:    The span.
+        :param coroutine: The coroutine.
+        :return: The result of the coroutine.
+        """
+        with tracer.resume(parent):
+            return await coroutine
+
+
+# The shared event loop.
+event_loop = EventLoopThread()
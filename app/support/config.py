@@ -13,12 +13,21 @@ def load_config() -> Dict[str, Any]:
     :return: The configuration data.
     """
     # Now load up the configuration data.
-    with open(State.current.config_file_path) as config_file:
-        config = json.load(config_file)
-        validate_data(isinstance(config, dict), lambda: ValueError('Configuration root is not an object'))
-        validate_data('switches' in config, lambda: KeyError('No switches defined'))
-        validate_data('devices' in config, lambda: KeyError('No devices defined'))
-        return config
+    with open(State.current.config_file_path, "rb") as config_file:
+        return parse_config(config_file.read())
+
+
+def parse_config(data: bytes) -> Dict[str, Any]:
+    """
+    Parses the configuration data.
+    :param data: The contents of the configuration file.
+    :return: The configuration data.
+    """
+    config = json.loads(data.decode("utf-8"))
+    validate_data(isinstance(config, dict), lambda: ValueError('Configuration root is not an object'))
+    validate_data('switches' in config, lambda: KeyError('No switches defined'))
+    validate_data('devices' in config, lambda: KeyError('No devices defined'))
+    return config
 
 
 def get_config_path(sub: str = '') -> str:
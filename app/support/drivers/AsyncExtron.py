@@ -0,0 +1,190 @@
+from typing import Dict, Any, List, Union
+import time
+import asyncio
+
+import serial
+
+from .. import AsyncDriver
+from ..Driver import ChannelTie
+from ..tracing import tracer
+from .Extron import ExtronSettings
+from .libraries.async_serial.stream import SerialStream
+from .libraries.extron_sis.protocol import Reply, ReplyKind, join_quick_tie, confirm_tie, confirm_quick_tie
+from .libraries.extron_sis.session import SisSession
+
+
+class AsyncExtron(AsyncDriver):
+    """Extron SIS Driver for Extron matrix switches, using asyncio streams for both serial and network connections."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instances of the asynchronous Extron driver.
+        :param config: The configuration data from the configuration about the device.
+        """
+        self.settings = ExtronSettings(config)
+        super().__init__(config, self.settings.capabilities)
+
+        self.__lock = None  # type: Union[None, asyncio.Lock]
+        self.__serial = None  # type: Union[None, SerialStream]
+        self.__reader = None  # type: Union[None, asyncio.StreamReader]
+        self.__writer = None  # type: Union[None, asyncio.StreamWriter]
+        self.__keep_alive = None  # type: Union[None, asyncio.Future]
+        self.__last_activity = 0.0
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its commands.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.prepare_tie(input_channel, video_output_channel, audio_output_channel)
+
+    async def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Sets input and output ties.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        command = self.settings.prepare_tie(input_channel, video_output_channel, audio_output_channel)[0]
+
+        # Confirm the video, then audio result.
+        replies = await self.__send_command(command, 2)
+        confirm_tie(replies, input_channel, video_output_channel, audio_output_channel)
+
+    async def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties with a single quick multiple tie command.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        parts = [self.settings.prepare_tie(*tie)[1] for tie in ties]
+        confirm_quick_tie(await self.__send_command(join_quick_tie(parts), 1))
+
+    async def close(self) -> None:
+        """Closes the connection to the switch."""
+        if self.__keep_alive is not None and self.__keep_alive is not asyncio.current_task():
+            self.__keep_alive.cancel()
+        if self.__serial is not None:
+            self.__serial.close()
+        if self.__writer is not None:
+            self.__writer.close()
+
+        self.__serial = None
+        self.__reader = None
+        self.__writer = None
+        self.__keep_alive = None
+
+    async def __send_command(self, command: bytes, replies: int) -> List[Reply]:
+        """
+        Sends a command to the switch and waits on its replies, connecting or reconnecting as needed.
+        :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: The replies.
+        """
+        if self.__lock is None:
+            self.__lock = asyncio.Lock()
+
+        async with self.__lock:
+            try:
+                return await asyncio.wait_for(self.__exchange(command, replies), SisSession.TIMEOUT)
+            except (OSError, EOFError, asyncio.TimeoutError):
+                # Either the connection was lost, or the replies can no longer be matched with their commands.
+                await self.close()
+                if self.settings.host is None:
+                    raise
+
+            # The switch may have dropped the connection since it was last used, try once more on a new one.
+            try:
+                return await asyncio.wait_for(self.__exchange(command, replies), SisSession.TIMEOUT)
+            except (OSError, EOFError, asyncio.TimeoutError):
+                await self.close()
+                raise
+
+    async def __exchange(self, command: bytes, replies: int) -> List[Reply]:
+        """
+        Writes a command and reads its replies, connecting if needed.
+        :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: The replies.
+        :raises SisReplyError: If any reply was an error.
+        """
+        await self.__connect()
+        channel = self.settings.host or self.settings.tty_path
+        with tracer.span("write", "io", {"channel": channel, "bytes": len(command)}):
+            if self.__serial is not None:
+                await self.__serial.write(command)
+            else:
+                self.__writer.write(command)
+                await self.__writer.drain()
+        self.count_written(len(command))
+
+        result = []  # type: List[Reply]
+        with tracer.span("read", "io", {"channel": channel, "replies": replies}):
+            while len(result) < replies:
+                reply = await self.__read_reply()
+                if reply.kind != ReplyKind.UNSOLICITED:
+                    result.append(reply)
+
+        self.__last_activity = time.monotonic()
+        errors = [reply.error() for reply in result if reply.kind == ReplyKind.ERROR]
+        if len(errors) > 0:
+            raise errors[0]
+
+        return result
+
+    async def __connect(self) -> None:
+        """Opens the connection, and for the network waits on the log-in message, if not already connected."""
+        if self.__serial is not None or self.__writer is not None:
+            return
+
+        if self.settings.tty_path is not None:
+            self.__serial = await SerialStream.open(self.settings.tty_path, 9600, serial.EIGHTBITS,
+                                                    serial.PARITY_NONE, serial.STOPBITS_ONE)
+        else:
+            with tracer.span("connect", "io", {"host": self.settings.host, "port": self.settings.port}):
+                self.__reader, self.__writer = await asyncio.open_connection(self.settings.host, self.settings.port)
+            # Read the log-in message, the copyright banner followed by the date and time.
+            with tracer.span("banner", "io", {"host": self.settings.host}):
+                await self.__read_reply()
+                await self.__read_reply()
+            self.__last_activity = time.monotonic()
+            self.__keep_alive = asyncio.ensure_future(self.__keep_alive_loop())
+
+        # The switch may have been changed by something else while we were not connected.
+        self.notify_reset()
+
+    async def __read_reply(self) -> Reply:
+        """
+        Reads the next non-empty line from the switch.
+        :return: The parsed reply.
+        """
+        while True:
+            if self.__serial is not None:
+                line = await self.__serial.readline()
+            else:
+                line = await self.__reader.readline()
+
+            if len(line) == 0:
+                raise ConnectionResetError("Connection closed by the switch")
+
+            line = line.rstrip(b'\r\n')
+            if len(line) > 0:
+                return Reply.parse(line)
+
+    async def __keep_alive_loop(self) -> None:
+        """Periodically queries the switch so it does not time out an idle session."""
+        # The loop was started by a command, but is not part of it.
+        with tracer.resume(None):
+            while True:
+                await asyncio.sleep(SisSession.KEEP_ALIVE_INTERVAL / 4)
+                if time.monotonic() - self.__last_activity < SisSession.KEEP_ALIVE_INTERVAL:
+                    continue
+
+                async with self.__lock:
+                    try:
+                        await asyncio.wait_for(self.__exchange(SisSession.KEEP_ALIVE_COMMAND, 1), SisSession.TIMEOUT)
+                    except (OSError, EOFError, asyncio.TimeoutError):
+                        # Leave it closed, the next command will reconnect.
+                        await self.close()
+                        return
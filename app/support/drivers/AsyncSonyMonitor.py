@@ -0,0 +1,75 @@
+from typing import Dict, Any, List, Union
+
+import serial
+
+from .. import AsyncDriver
+from ..Driver import ChannelTie
+from ..tracing import tracer
+from .SonyMonitor import SonySettings, SonyBvmDSeries
+from .libraries.async_serial.stream import SerialStream
+from .libraries.sony_bvm_rs485.protocol import Command
+
+
+class AsyncSonyBvmDSeries(AsyncDriver):
+    """Sony BVM D-series Monitor Driver, using a non-blocking serial port."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instance of the asynchronous Sony BVM D-series monitor driver.
+        :param config:   The device configuration.
+        """
+        self.settings = SonySettings(config)
+        super().__init__(config, self.settings.capabilities)
+
+        self.__serial = None  # type: Union[None, SerialStream]
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its command.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.tie_command(input_channel, video_output_channel, audio_output_channel)
+
+    async def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Sets input and output ties.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        await self.__send_command(self.settings.tie_command(input_channel, video_output_channel, audio_output_channel))
+
+    async def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties, with the commands for all the monitors sent to the bus at once.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        await self.__send_command(b"".join(self.settings.tie_command(*tie) for tie in ties))
+
+    async def power_on(self) -> None:
+        """Powers on the monitor."""
+        await self.__send_command(SonyBvmDSeries.encode_command(Command.POWER_ON))
+
+    async def power_off(self) -> None:
+        """Powers off the monitor."""
+        await self.__send_command(SonyBvmDSeries.encode_command(Command.POWER_OFF))
+
+    async def close(self) -> None:
+        """Closes the serial port."""
+        if self.__serial is not None:
+            self.__serial.close()
+            self.__serial = None
+
+    async def __send_command(self, packet: bytes) -> None:
+        """
+        Sends encoded commands to the monitor.
+        :param packet: The encoded command packets.
+        """
+        if self.__serial is None:
+            self.__serial = await SerialStream.open(self.settings.tty_path, 38400, serial.EIGHTBITS, serial.PARITY_ODD,
+                                                    serial.STOPBITS_ONE)
+        with tracer.span("write", "io", {"tty": self.settings.tty_path, "bytes": len(packet)}):
+            await self.__serial.write(packet)
+        self.count_written(len(packet))
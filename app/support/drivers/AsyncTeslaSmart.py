@@ -0,0 +1,76 @@
+from typing import Dict, Any, Union
+import asyncio
+
+import serial
+
+from .. import AsyncDriver
+from ..tracing import tracer
+from .TeslaSmart import TeslaSettings
+from .libraries.async_serial.stream import SerialStream
+
+
+class AsyncTeslaSmart(AsyncDriver):
+    """Tesla-Smart HDMI and SDI switch driver, using asyncio streams for both serial and network connections."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instances of the asynchronous Tesla-Smart driver.
+        :param config:
+        """
+        super().__init__(config, 0)
+
+        self.settings = TeslaSettings(self.config)
+        self.max_inputs = self.settings.max_inputs
+        self.tty_path = self.settings.tty_path
+        self.host = self.settings.host
+        self.port = self.settings.port
+        self.__serial = None  # type: Union[None, SerialStream]
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its command.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.tie_command(input_channel, video_output_channel, audio_output_channel)
+
+    async def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Sets input and output ties.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        await self.__send_command(self.settings.tie_command(input_channel, video_output_channel, audio_output_channel))
+
+    async def close(self) -> None:
+        """Closes the connection to the switch."""
+        if self.__serial is not None:
+            self.__serial.close()
+            self.__serial = None
+
+    async def __send_command(self, command: bytes) -> None:
+        """
+        Sends a command to the switch.
+        :param command: The command to send.
+        """
+        self.count_written(len(command))
+        if self.tty_path is not None:
+            # Send the command to the serial connection.
+            if self.__serial is None:
+                self.__serial = await SerialStream.open(self.tty_path, 9600, serial.EIGHTBITS, serial.PARITY_NONE,
+                                                        serial.STOPBITS_ONE)
+            with tracer.span("write", "io", {"tty": self.tty_path, "bytes": len(command)}):
+                await self.__serial.write(command)
+            self.__serial.discard_input()
+        else:
+            # Open a network connection and send the command.
+            with tracer.span("connect", "io", {"host": self.host, "port": self.port}):
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                with tracer.span("write", "io", {"host": self.host, "bytes": len(command)}):
+                    writer.write(command)
+                    await writer.drain()
+            finally:
+                writer.close()
@@ -1,53 +1,170 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple, Union
 import os
-import io
-import socket
 
 import serial
 
-from .. import Driver, DriverRegistration
+from .. import Driver, AsyncDriver, DriverRegistration
+from ..Driver import ChannelTie
 from ..validation import validate_value
+from .libraries.extron_sis.channel import SisChannel
+from .libraries.extron_sis.protocol import Reply, tie_command, quick_tie_part, join_quick_tie, confirm_tie, \
+    confirm_quick_tie
+from .libraries.extron_sis.session import SisSession, sessions
+from .libraries.shared_serial.ports import PortHandle, ports
+
+
+class ExtronSettings:
+    """The settings shared by both variants of the Extron driver."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instance of the ExtronSettings class.
+        :param config: The configuration data from the configuration about the device.
+        """
+        validate_value("maxInputs" in config, "Missing `maxInputs` for Extron switch")
+        validate_value("maxOutputs" in config, "Missing `maxOutputs` for Extron switch")
+        validate_value("tty" in config or "host" in config, "Missing `tty` or `host` for Extron switch")
+
+        self.max_inputs = int(config["maxInputs"])
+        self.max_outputs = int(config["maxOutputs"])
+        if "tty" in config:
+            self.tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", config["tty"]))
+            self.host = None
+        else:
+            self.tty_path = None
+            self.host = config["host"]
+
+        # The telnet port only ever differs from the standard port for simulated switches.
+        self.port = int(config.get("port", SisSession.PORT))
+
+        self.capabilities = Driver.CAN_DECOUPLE_AUDIO_OUTPUT
+        if self.max_outputs > 1:
+            self.capabilities = int(self.capabilities | Driver.HAS_MULTIPLE_OUTPUTS)
+
+        self.__prepared = {}  # type: Dict[ChannelTie, Tuple[bytes, bytes]]
+
+    def validate_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates the channels of a tie.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        validate_value(1 <= input_channel <= self.max_inputs, "Input channel is out of range")
+        validate_value(1 <= video_output_channel <= self.max_outputs, "Video output channel is out of range")
+        validate_value(1 <= audio_output_channel <= self.max_outputs, "Audio output channel is out of range")
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> \
+            Tuple[bytes, bytes]:
+        """
+        Validates and encodes the commands for a tie, only the first time the tie is used.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :return: The tie command, and the part of a quick multiple tie command for the tie.
+        """
+        tie = (input_channel, video_output_channel, audio_output_channel)
+        prepared = self.__prepared.get(tie)
+        if prepared is None:
+            self.validate_tie(*tie)
+            prepared = (tie_command(*tie), quick_tie_part(*tie))
+            self.__prepared[tie] = prepared
+
+        return prepared
 
 
 class Extron(Driver):
     """Extron SIS Driver for Extron matrix switches using RS-232 mode."""
 
-    __TIE_VIDEO = "{0}*{1}%"
-    __TIE_AUDIO = "{0}*{1}$"
-
     def __init__(self, config: Dict[str, Any]):
         """
         Initializes a new instances of the Extron driver.
         :param config: The configuration data from the configuration about the device.
         """
-        super().__init__(config, Driver.CAN_DECOUPLE_AUDIO_OUTPUT)
+        self.settings = ExtronSettings(config)
+        super().__init__(config, self.settings.capabilities)
 
-        validate_value("maxInputs" in self.config, "Missing `maxInputs` for Extron switch")
-        validate_value("maxOutputs" in self.config, "Missing `maxOutputs` for Extron switch")
-        validate_value("tty" in self.config or "host" in self.config, "Missing `tty` or `host` for Extron switch")
-
-        self.max_inputs = int(self.config["maxInputs"])
-        self.max_outputs = int(self.config["maxOutputs"])
-        if "tty" in self.config:
-            tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", self.config["tty"]))
-            self.host = None
-            self.serial = serial.Serial(tty_path, 9600, serial.EIGHTBITS, serial.PARITY_NONE, serial.STOPBITS_ONE)
+        self.max_inputs = self.settings.max_inputs
+        self.max_outputs = self.settings.max_outputs
+        self.host = self.settings.host
+        self.serial = None  # type: Union[None, PortHandle]
+        self.channel = None  # type: Union[None, SisChannel]
+        if self.settings.tty_path is not None:
+            self.session = None
         else:
-            self.host = self.config["host"]
+            self.session = sessions.get(self.host, self.settings.port)
+            self.session.reset_listeners.append(self.notify_reset)
+
+    def open(self) -> None:
+        """Opens the serial port and its SIS channel, the network session connects on its own when first used."""
+        if self.settings.tty_path is None or self.channel is not None:
+            return
+
+        port = self.serial
+        if port is None:
+            port = ports.open(self.settings.tty_path, 9600, serial.EIGHTBITS, serial.PARITY_NONE, serial.STOPBITS_ONE)
+
+        try:
+            # Any other switch on the same port shares the channel, since replies can only be read by one reader.
+            self.channel = port.attachment("sis", lambda: Extron.__open_channel(port))
+        except Exception:
+            if self.serial is None:
+                port.close()
+            raise
+
+        self.serial = port
+
+    def close(self) -> None:
+        """Releases the serial port, or stops listening to the network session which is shared with other switches."""
+        if self.serial is not None:
+            self.serial.close()
             self.serial = None
+            self.channel = None
 
-        if self.max_outputs > 1:
-            self.capabilities = int(self.capabilities | Driver.HAS_MULTIPLE_OUTPUTS)
+        if self.session is not None and self.notify_reset in self.session.reset_listeners:
+            self.session.reset_listeners.remove(self.notify_reset)
 
     def __del__(self):
         """Cleans up an instance of the Extron driver."""
         if self.serial is not None:
             self.serial.close()
 
+    @staticmethod
+    def __open_channel(port: PortHandle) -> SisChannel:
+        """
+        Opens the SIS channel for a serial port.
+        :param port: The port.
+        :return: The channel.
+        """
+        # Anything already waiting is not a reply to our commands.
+        port.reset_input_buffer()
+        return SisChannel(port.path, lambda: port.read(port.in_waiting or 1), port.write)
+
     @staticmethod
     def register() -> DriverRegistration:
         """Registers the Extron SIS driver."""
-        return DriverRegistration("extron", "Extron SIS", lambda config: Extron(config))
+        return DriverRegistration("extron", "Extron SIS", lambda config: Extron(config),
+                                  Extron.load_async)
+
+    @staticmethod
+    def load_async(config: Dict[str, Any]) -> AsyncDriver:
+        """
+        Creates the asynchronous variant of the driver, which is only imported when used since it needs asyncio.
+        :param config: The configuration data from the configuration about the device.
+        :return: The asynchronous driver.
+        """
+        from .AsyncExtron import AsyncExtron
+
+        return AsyncExtron(config)
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its commands.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.prepare_tie(input_channel, video_output_channel, audio_output_channel)
 
     def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
         """
@@ -56,37 +173,50 @@ class Extron(Driver):
         :param video_output_channel: The output video channel of the tie.
         :param audio_output_channel: The output audio channel of the tie.
         """
-        validate_value(1 <= input_channel <= self.max_inputs, "Input channel is out of range")
-        validate_value(1 <= video_output_channel <= self.max_outputs, "Video output channel is out of range")
-        validate_value(1 <= audio_output_channel <= self.max_outputs, "Audio output channel is out of range")
+        command = self.settings.prepare_tie(input_channel, video_output_channel, audio_output_channel)[0]
 
-        command = "{0}\r\n{1}".format(
-            Extron.__TIE_VIDEO.format(input_channel, video_output_channel),
-            Extron.__TIE_AUDIO.format(input_channel, audio_output_channel)
-        )
+        # Confirm the video, then audio result.
+        replies = self.__send_command(command, 2)
+        confirm_tie(replies, input_channel, video_output_channel, audio_output_channel)
 
-        self.__send_command(command)
+    def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties with a single quick multiple tie command.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        confirm_quick_tie(self.__send_command(join_quick_tie(self.settings.prepare_tie(*tie)[1] for tie in ties), 1))
 
-    def __send_command(self, command: str) -> None:
+    def __send_command(self, command: bytes, replies: int) -> List[Reply]:
         """
-        Sends a command to the switch.
+        Sends a command to the switch and waits on its replies.
         :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: The replies.
         """
-        if self.serial is not None:
-            # Send the command to the serial connection.
-            self.serial.write(command.encode())
+        self.count_written(len(command))
+        if self.session is not None:
+            # Send the command over the shared session.
+            return self.session.send(command, replies)
+
+        # Send the command to the serial connection, on a new channel if the last one was closed.
+        if self.channel is not None and self.channel.closed:
+            self.__discard_channel(self.channel)
+
+        self.open()
+        channel = self.channel
+        try:
+            return channel.send(command, replies)
+        except TimeoutError:
+            self.__discard_channel(channel)
+            raise
+
+    def __discard_channel(self, channel: SisChannel) -> None:
+        """
+        Discards a closed SIS channel, along with any replies still waiting on the port, since they can no longer be
+        matched with their commands.
+        :param channel: The channel.
+        """
+        self.channel = None
+        channel.close(True)
+        if self.serial.detach("sis", channel):
             self.serial.reset_input_buffer()
-        else:
-            # Open a network connection and send the command.
-            with socket.create_connection((self.host, 23)) as connection:
-                with connection.makefile(mode='rwb') as stream:  # type: io.BufferedWriter
-                    # Read the log-in message, there may be an empty line before it.
-                    while len(stream.readline().rstrip(b'\r\n')) == 0:
-                        pass
-                    stream.readline()
-                    # Write the command.
-                    stream.write(command.encode())
-                    stream.flush()
-                    # Read the video, then audio result.
-                    stream.readline()
-                    stream.readline()
@@ -1,11 +1,82 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Union
 import os
 
 import serial
 
-from .. import Driver, DriverRegistration
+from .. import Driver, AsyncDriver, DriverRegistration
+from ..Driver import ChannelTie
 from ..validation import validate_value
-from .libraries.sony_bvm_rs485.protocol import AddressKind, Address, Command, CommandBlock
+from ..tracing import tracer
+from .libraries.shared_serial.ports import PortHandle, ports
+from .libraries.sony_bvm_rs485.protocol import AddressKind, Address, Command, Packet, encode_command
+
+_ALL_MONITORS = Address(AddressKind.ALL, 0).package()
+
+
+class SonySettings:
+    """The settings shared by both variants of the Sony BVM D-series driver."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instance of the SonySettings class.
+        :param config: The device configuration.
+        """
+        validate_value("tty" in config, "Missing `tty` for Sony D-series monitor")
+
+        self.tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", config["tty"]))
+
+        # Each output may address a single monitor or a group of monitors on the bus, without any outputs all the
+        # monitors on the bus are addressed as one.
+        self.outputs = {}  # type: Dict[int, int]
+        for output, address in config.get("outputs", {}).items():
+            validate_value(isinstance(address, dict) and len(address) == 1 and
+                           ("monitor" in address or "group" in address),
+                           "Output `{0}` must give either a `monitor` or `group`".format(output))
+            if "monitor" in address:
+                kind, number = AddressKind.MONITOR, int(address["monitor"])
+            else:
+                kind, number = AddressKind.GROUP, int(address["group"])
+
+            validate_value(0 <= number <= 0x1F, "Address of output `{0}` is out of range".format(output))
+            self.outputs[int(output)] = Address(kind, number).package()
+
+        self.capabilities = Driver.HAS_MULTIPLE_OUTPUTS if len(self.outputs) > 0 else 0
+        self.__commands = {}  # type: Dict[ChannelTie, bytes]
+
+    def validate_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates the channels of a tie.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        validate_value(1 <= input_channel <= 99, "Input channel is out of range")
+        if len(self.outputs) > 0:
+            validate_value(video_output_channel in self.outputs, "Video output channel is out of range")
+            validate_value(audio_output_channel == video_output_channel, "Audio output channel is out of range")
+        else:
+            validate_value(video_output_channel == 0, "Video output channel is out of range")
+            validate_value(audio_output_channel == 0, "Audio output channel is out of range")
+
+    def tie_command(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> bytes:
+        """
+        Validates and encodes the command for a tie, only the first time the tie is used.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :return: The encoded packet.
+        """
+        tie = (input_channel, video_output_channel, audio_output_channel)
+        command = self.__commands.get(tie)
+        if command is None:
+            self.validate_tie(*tie)
+
+            # Not sure why, but all channel sets have 1 as their first argument.
+            destination = self.outputs.get(video_output_channel, _ALL_MONITORS)
+            command = encode_command(destination, _ALL_MONITORS, Command.SET_CHANNEL, 1, input_channel)
+            self.__commands[tie] = command
+
+        return command
 
 
 class SonyBvmDSeries(Driver):
@@ -16,21 +87,53 @@ class SonyBvmDSeries(Driver):
         Initializes a new instance of the Sony BVM D-series monitor driver.
         :param config:   The device configuration.
         """
-        super().__init__(config, 0)
+        self.settings = SonySettings(config)
+        super().__init__(config, self.settings.capabilities)
 
-        validate_value("tty" in self.config, "Missing `tty` for Sony D-series monitor")
+        self.serial = None  # type: Union[None, PortHandle]
 
-        tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", self.config["tty"]))
-        self.serial = serial.Serial(tty_path, 38400, serial.EIGHTBITS, serial.PARITY_ODD, serial.STOPBITS_ONE)
+    def close(self) -> None:
+        """Releases the serial port."""
+        if self.serial is not None:
+            self.serial.close()
+            self.serial = None
 
     def __del__(self):
         """Cleans up an instance of the Sony BVM D-series monitor driver."""
-        self.serial.close()
+        if self.serial is not None:
+            self.serial.close()
+
+    def open(self) -> None:
+        """Opens the serial port."""
+        if self.serial is None:
+            self.serial = ports.open(self.settings.tty_path, 38400, serial.EIGHTBITS, serial.PARITY_ODD,
+                                     serial.STOPBITS_ONE)
 
     @staticmethod
     def register() -> DriverRegistration:
         """Registers the Sony BVD-D series driver."""
-        return DriverRegistration("sony-bvm-d", "Sony BVM-D series", lambda config: SonyBvmDSeries(config))
+        return DriverRegistration("sony-bvm-d", "Sony BVM-D series", lambda config: SonyBvmDSeries(config),
+                                  SonyBvmDSeries.load_async)
+
+    @staticmethod
+    def load_async(config: Dict[str, Any]) -> AsyncDriver:
+        """
+        Creates the asynchronous variant of the driver, which is only imported when used since it needs asyncio.
+        :param config: The configuration data from the configuration about the device.
+        :return: The asynchronous driver.
+        """
+        from .AsyncSonyMonitor import AsyncSonyBvmDSeries
+
+        return AsyncSonyBvmDSeries(config)
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its command.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.tie_command(input_channel, video_output_channel, audio_output_channel)
 
     def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
         """
@@ -39,12 +142,16 @@ class SonyBvmDSeries(Driver):
         :param video_output_channel: The output video channel of the tie.
         :param audio_output_channel: The output audio channel of the tie.
         """
-        validate_value(1 <= input_channel <= 99, "Input channel is out of range")
-        validate_value(video_output_channel == 0, "Video output channel is out of range")
-        validate_value(audio_output_channel == 0, "Audio output channel is out of range")
+        self.__write(self.settings.tie_command(input_channel, video_output_channel, audio_output_channel))
 
-        # Not sure why, but all channel sets have 1 as their first argument.
-        self.__send_command(Command.SET_CHANNEL, 1, input_channel)
+    def set_ties(self, ties: List[ChannelTie]) -> None:
+        """
+        Sets several input and output ties, with the commands for all the monitors sent to the bus at once.
+        :param ties: The input, video output, and audio output channels of each tie.
+        """
+        packets = [self.settings.tie_command(*tie) for tie in ties]
+        with tracer.span("write", "io", {"tty": self.serial.path, "packets": len(packets)}):
+            self.count_written(Packet.write_all(self.serial, packets))
 
     def power_on(self) -> None:
         """Powers on the monitor."""
@@ -61,10 +168,24 @@ class SonyBvmDSeries(Driver):
         :param arg0:    The first argument of the command.
         :param arg1:    The second argument of the command.
         """
-        source = Address(AddressKind.ALL, 0)
-        destination = Address(AddressKind.ALL, 0)
+        self.__write(SonyBvmDSeries.encode_command(command, arg0, arg1))
 
-        command = CommandBlock(destination, source, command, arg0, arg1)
-        packet = command.package()
+    def __write(self, packet: bytes) -> None:
+        """
+        Writes encoded packets to the monitor.
+        :param packet: The encoded packets.
+        """
+        with tracer.span("write", "io", {"tty": self.serial.path, "bytes": len(packet)}):
+            self.serial.write(packet)
+        self.count_written(len(packet))
 
-        packet.write(self.serial)
+    @staticmethod
+    def encode_command(command: Command, arg0: int = -1, arg1: int = -1) -> bytes:
+        """
+        Encodes a command to all monitors as a packet.
+        :param command: The command to encode.
+        :param arg0:    The first argument of the command.
+        :param arg1:    The second argument of the command.
+        :return: The encoded packet.
+        """
+        return encode_command(_ALL_MONITORS, _ALL_MONITORS, command, arg0, arg1)
@@ -1,17 +1,73 @@
-from typing import Dict, Any
+from typing import Dict, Any, Union
 import os
 import io
 import socket
 
 import serial
 
-from .. import Driver, DriverRegistration
+from .. import Driver, AsyncDriver, DriverRegistration
+from ..Driver import ChannelTie
 from ..validation import validate_value
+from ..tracing import tracer
+from .libraries.shared_serial.ports import PortHandle, ports
+
+
+class TeslaSettings:
+    """The settings, and the tie validation and encoding, shared by both variants of the Tesla-Smart driver."""
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initializes a new instance of the TeslaSettings class.
+        :param config: The configuration data from the configuration about the device.
+        """
+        validate_value("maxInputs" in config, "Missing `maxInputs` for Tesla-Smart switch")
+        validate_value("tty" in config or "host" in config, "Missing `tty` or `host` for Tesla-Smart switch")
+
+        self.max_inputs = int(config['maxInputs'])
+        if "tty" in config:
+            self.tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", config["tty"]))
+            self.host = None
+        else:  # "host" in config
+            self.tty_path = None
+            self.host = config["host"]
+
+        self.port = int(config.get("port", TeslaSmart.PORT))
+        self.__commands = {}  # type: Dict[ChannelTie, bytes]
+
+    def validate_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates the channels of a tie.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        validate_value(1 <= input_channel <= self.max_inputs, "Input channel is out of range")
+        validate_value(video_output_channel == 0, 'Video output channel is out of range')
+        validate_value(audio_output_channel == 0, 'Audio output channel is out of range')
+
+    def tie_command(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> bytes:
+        """
+        Validates and encodes the command for a tie, only the first time the tie is used.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        :return: The encoded command.
+        """
+        tie = (input_channel, video_output_channel, audio_output_channel)
+        command = self.__commands.get(tie)
+        if command is None:
+            self.validate_tie(*tie)
+            command = TeslaSmart.set_channel_command(input_channel)
+            self.__commands[tie] = command
+
+        return command
 
 
 class TeslaSmart(Driver):
     """Tesla-Smart HDMI and SDI switch driver."""
 
+    PORT = 5000  # The network port of the switch.
+
     __SET_CHANNEL = b"\xAA\xBB\x03\x01%b\xEE"
 
     def __init__(self, config: Dict[str, Any]):
@@ -21,16 +77,22 @@ class TeslaSmart(Driver):
         """
         super().__init__(config, 0)
 
-        validate_value("maxInputs" in self.config, "Missing `maxInputs` for Tesla-Smart switch")
-        validate_value("tty" in self.config or "host" in self.config, "Missing `tty` or `host` for Extron switch")
+        self.settings = TeslaSettings(self.config)
+        self.max_inputs = self.settings.max_inputs
+        self.tty_path = self.settings.tty_path
+        self.host = self.settings.host
+        self.port = self.settings.port
+        self.serial = None  # type: Union[None, PortHandle]
 
-        self.max_inputs = int(self.config['maxInputs'])
-        if "tty" in self.config:
-            tty_path = os.path.realpath(os.path.join(os.path.sep, "dev", self.config["tty"]))
-            self.host = None
-            self.serial = serial.Serial(tty_path, serial.EIGHTBITS, serial.PARITY_NONE, serial.STOPBITS_ONE)
-        else:  # "host" in self.config
-            self.host = self.config["host"]
+    def open(self) -> None:
+        """Opens the serial port, network connections are made for each command."""
+        if self.tty_path is not None and self.serial is None:
+            self.serial = ports.open(self.tty_path, 9600, serial.EIGHTBITS, serial.PARITY_NONE, serial.STOPBITS_ONE)
+
+    def close(self) -> None:
+        """Releases the serial port."""
+        if self.serial is not None:
+            self.serial.close()
             self.serial = None
 
     def __del__(self):
@@ -41,7 +103,28 @@ class TeslaSmart(Driver):
     @staticmethod
     def register() -> DriverRegistration:
         """Registers the Tesla-Smart driver."""
-        return DriverRegistration("tesla-smart", "Tesla-Smart", lambda config: TeslaSmart(config))
+        return DriverRegistration("tesla-smart", "Tesla-Smart", lambda config: TeslaSmart(config),
+                                  TeslaSmart.load_async)
+
+    @staticmethod
+    def load_async(config: Dict[str, Any]) -> AsyncDriver:
+        """
+        Creates the asynchronous variant of the driver, which is only imported when used since it needs asyncio.
+        :param config: The configuration data from the configuration about the device.
+        :return: The asynchronous driver.
+        """
+        from .AsyncTeslaSmart import AsyncTeslaSmart
+
+        return AsyncTeslaSmart(config)
+
+    def prepare_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+        """
+        Validates a tie, and encodes its command.
+        :param input_channel:        The input channel of the tie.
+        :param video_output_channel: The output video channel of the tie.
+        :param audio_output_channel: The output audio channel of the tie.
+        """
+        self.settings.tie_command(input_channel, video_output_channel, audio_output_channel)
 
     def set_tie(self, input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
         """
@@ -50,24 +133,33 @@ class TeslaSmart(Driver):
         :param video_output_channel: The output video channel of the tie.
         :param audio_output_channel: The output audio channel of the tie.
         """
-        validate_value(1 <= input_channel <= self.max_inputs, "Input channel is out of range")
-        validate_value(video_output_channel == 0, 'Video output channel is out of range')
-        validate_value(audio_output_channel == 0, 'Audio output channel is out of range')
+        self.__send_command(self.settings.tie_command(input_channel, video_output_channel, audio_output_channel))
 
-        self.__send_command(TeslaSmart.__SET_CHANNEL % input_channel.to_bytes(1, "big", signed=False))
+    @staticmethod
+    def set_channel_command(input_channel: int) -> bytes:
+        """
+        Creates the command to select an input.
+        :param input_channel: The input channel.
+        :return: The encoded command.
+        """
+        return TeslaSmart.__SET_CHANNEL % input_channel.to_bytes(1, "big", signed=False)
 
     def __send_command(self, command: bytes) -> None:
         """
         Sends a command to the switch.
         :param command: The command to send.
         """
+        self.count_written(len(command))
         if self.serial is not None:
             # Send the command to the serial connection.
-            self.serial.write(command)
+            with tracer.span("write", "io", {"tty": self.serial.path, "bytes": len(command)}):
+                self.serial.write(command)
             self.serial.reset_input_buffer()
         else:
             # Open a network connection and send the command.
-            with socket.create_connection((self.host, 5000)) as connection:
-                with connection.makefile(mode='wb') as stream:  # type: io.BufferedWriter
+            with tracer.span("connect", "io", {"host": self.host, "port": self.port}):
+                connection = socket.create_connection((self.host, self.port))
+            with connection, connection.makefile(mode='wb') as stream:  # type: io.BufferedWriter
+                with tracer.span("write", "io", {"host": self.host, "bytes": len(command)}):
                     stream.write(command)
                     stream.flush()
@@ -1,7 +1,7 @@
 from typing import Any, Dict
 import logging
 
-from .. import Driver, DriverRegistration
+from .. import Driver, SyncDriverShim, DriverRegistration
 from ..validation import validate_value
 from .Extron import Extron
 from .SonyMonitor import SonyBvmDSeries
@@ -48,4 +48,10 @@ def load_driver(switch_id: str, config: Dict[str, Any]) -> Driver:
     registration = drivers[name]
     log.info("Loading `{0}` for `{1}` as `{2}`".format(registration.title, title, switch_id))
 
+    # Asynchronous drivers all share one event loop, rather than each tying up threads.
+    if bool(config['async'] if 'async' in config else False):
+        validate_value(registration.async_ctor is not None,
+                       "Driver `{0}` has no asynchronous variant for `{1}`".format(name, switch_id))
+        return SyncDriverShim(registration.async_ctor(config['config']))
+
     return registration.ctor(config['config'])
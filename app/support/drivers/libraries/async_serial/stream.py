@@ -0,0 +1,101 @@
+from typing import Union
+import asyncio
+import functools
+import os
+
+import serial
+
+
+class SerialStream:
+    """Reads and writes a serial port from an asyncio event loop without blocking it."""
+
+    def __init__(self, port: serial.Serial):
+        """
+        Initializes a new instance of the SerialStream class, this must be called on the event loop.
+        :param port: The opened port, pyserial leaves its descriptor non-blocking.
+        """
+        self.port = port
+        self.__loop = asyncio.get_event_loop()
+        self.__fd = port.fileno()
+        self.__reader = asyncio.StreamReader()
+        self.__loop.add_reader(self.__fd, self.__on_readable)
+
+    @classmethod
+    async def open(cls, path: str, baudrate: int, bytesize: int, parity: str, stopbits: Union[int, float]):
+        """
+        Opens and configures a serial port.
+        :param path:     The path to the port.
+        :param baudrate: The line speed.
+        :param bytesize: The number of data bits.
+        :param parity:   The parity checking.
+        :param stopbits: The number of stop bits.
+        :return: The stream for the port.
+        :rtype:  SerialStream
+        """
+        # Opening and configuring the port may block for a moment, so it is done off the event loop.
+        port = await asyncio.get_event_loop().run_in_executor(None, functools.partial(
+            serial.Serial, path, baudrate, bytesize, parity, stopbits, timeout=0, write_timeout=0))
+        return SerialStream(port)
+
+    async def write(self, data: bytes) -> None:
+        """
+        Writes all the data, waiting on the port whenever its buffer is full.
+        :param data: The data to write.
+        """
+        view = memoryview(data)
+        while len(view) > 0:
+            try:
+                written = os.write(self.__fd, view)
+            except BlockingIOError:
+                written = 0
+
+            view = view[written:]
+            if len(view) > 0:
+                await self.__writable()
+
+    async def read(self, size: int) -> bytes:
+        """
+        Reads exactly the number of bytes requested.
+        :param size: The number of bytes to read.
+        :return: The data read.
+        """
+        return await self.__reader.readexactly(size)
+
+    async def readline(self) -> bytes:
+        """
+        Reads a line, including its line ending.
+        :return: The line read.
+        """
+        return await self.__reader.readline()
+
+    def discard_input(self) -> None:
+        """Discards any data received but not yet read."""
+        self.__reader = asyncio.StreamReader()
+
+    def close(self) -> None:
+        """Closes the port."""
+        self.__loop.remove_reader(self.__fd)
+        self.port.close()
+
+    def __on_readable(self) -> None:
+        """Moves the data waiting on the port into the reader."""
+        try:
+            data = os.read(self.__fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            self.__loop.remove_reader(self.__fd)
+            self.__reader.set_exception(e)
+            return
+
+        if len(data) > 0:
+            self.__reader.feed_data(data)
+
+    async def __writable(self) -> None:
+        """Waits until the port can accept more data."""
+        ready = self.__loop.create_future()
+        self.__loop.add_writer(self.__fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        finally:
+            self.__loop.remove_writer(self.__fd)
@@ -0,0 +1,190 @@
+from typing import Any, Callable, List, Union
+from collections import deque
+from concurrent.futures import Future
+import concurrent.futures
+import threading
+import logging
+
+from .protocol import Reply, ReplyKind
+from ....tracing import tracer
+
+log = logging.getLogger(__name__)
+
+# Reads whatever bytes are available, returning an empty result if none arrived in time, or raising if the connection
+# is gone.
+ChunkReader = Callable[[], bytes]
+
+# Writes all the bytes given.
+ChunkWriter = Callable[[bytes], Any]
+
+
+class _Exchange:
+    """A command waiting on its replies."""
+
+    def __init__(self, replies: int):
+        """
+        Initializes a new instance of the _Exchange class.
+        :param replies: The number of replies expected.
+        """
+        self.expected = replies
+        self.replies = []  # type: List[Reply]
+        self.future = Future()
+        self.future.set_running_or_notify_cancel()
+
+
+class SisChannel:
+    """
+    Streams replies from an SIS connection and matches them to the commands in flight, so several commands may be
+    written without waiting on each one.  Replies are matched in the order the commands were written.
+    """
+
+    TIMEOUT = 5.0  # The number of seconds to wait on replies.
+
+    def __init__(self, name: str, reader: ChunkReader, writer: ChunkWriter, greeting: int = 0):
+        """
+        Initializes a new instance of the SisChannel class.
+        :param name:     The name of the channel, for logging.
+        :param reader:   Reads the next chunk of bytes from the connection.
+        :param writer:   Writes bytes to the connection.
+        :param greeting: The number of lines the switch sends on its own before accepting commands.
+        """
+        self.name = name
+        self.__reader = reader
+        self.__writer = writer
+        self.__write_lock = threading.Lock()
+        self.__lock = threading.Lock()
+        self.__in_flight = deque()  # type: deque[_Exchange]
+        self.__buffer = bytearray()
+        self.__closed = False
+
+        # Expect the greeting before the reader starts, so none of it is mistaken as unsolicited.
+        greeting_exchange = _Exchange(greeting)
+        self.greeting = greeting_exchange.future
+        if greeting > 0:
+            self.__in_flight.append(greeting_exchange)
+        else:
+            self.greeting.set_result([])
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="sis-{0}".format(name))
+        self.__thread.start()
+
+    @property
+    def closed(self) -> bool:
+        """Determines whether the channel was closed, or its connection lost."""
+        return self.__closed
+
+    def submit(self, command: bytes, replies: int) -> Future:
+        """
+        Writes a command without waiting on its replies.
+        :param command: The command to write.
+        :param replies: The number of replies the command will produce.
+        :return: A future for the replies; it fails with an `SisReplyError` if any reply was an error.
+        """
+        exchange = _Exchange(replies)
+        with self.__write_lock:
+            if self.__closed:
+                exchange.future.set_exception(ConnectionAbortedError("SIS channel `{0}` is closed".format(self.name)))
+                return exchange.future
+
+            with self.__lock:
+                self.__in_flight.append(exchange)
+
+            try:
+                with tracer.span("write", "io", {"channel": self.name, "bytes": len(command)}):
+                    self.__writer(command)
+            except Exception as e:
+                self.__fail(e)
+
+        return exchange.future
+
+    def send(self, command: bytes, replies: int, timeout: Union[None, float] = None) -> List[Reply]:
+        """
+        Writes a command and waits on its replies, the channel is closed if they do not arrive in time.
+        :param command: The command to write.
+        :param replies: The number of replies the command will produce.
+        :param timeout: The number of seconds to wait on the replies, `TIMEOUT` if not given.
+        :return: The replies.
+        :raises SisReplyError: If any reply was an error.
+        :raises TimeoutError:  If the replies did not arrive in time.
+        """
+        future = self.submit(command, replies)
+        try:
+            with tracer.span("read", "io", {"channel": self.name, "replies": replies}):
+                return future.result(SisChannel.TIMEOUT if timeout is None else timeout)
+        except concurrent.futures.TimeoutError:
+            # A reply went missing, so neither the remaining replies nor any late ones can be matched with their
+            # commands anymore.
+            error = TimeoutError("No reply from SIS channel `{0}`".format(self.name))
+            self.__closed = True
+            self.__fail(error)
+            raise error
+
+    def close(self, wait: bool = False) -> None:
+        """
+        Closes the channel, failing any commands in flight.
+        :param wait: Waits on the reader to stop, so that nothing more is read from the connection by this channel.
+        """
+        self.__closed = True
+        self.__fail(ConnectionAbortedError("SIS channel `{0}` is closed".format(self.name)))
+        if wait and self.__thread is not threading.current_thread():
+            self.__thread.join()
+
+    def __fail(self, error: Exception) -> None:
+        """
+        Fails all commands in flight.
+        :param error: The error for the commands.
+        """
+        with self.__lock:
+            in_flight = list(self.__in_flight)
+            self.__in_flight.clear()
+
+        for exchange in in_flight:
+            if not exchange.future.done():
+                exchange.future.set_exception(error)
+
+    def __run(self) -> None:
+        """Reads and dispatches replies until the channel is closed."""
+        while not self.__closed:
+            try:
+                chunk = self.__reader()
+            except Exception as e:
+                if not self.__closed:
+                    log.warning("Lost SIS channel `{0}`: {1}".format(self.name, e))
+                self.__closed = True
+                self.__fail(e)
+                return
+
+            if len(chunk) == 0:
+                continue
+
+            self.__buffer.extend(chunk)
+            end = self.__buffer.find(b'\n')
+            while end >= 0:
+                line = bytes(self.__buffer[:end]).rstrip(b'\r')
+                del self.__buffer[:end + 1]
+                if len(line) > 0:
+                    self.__dispatch(Reply.parse(line))
+                end = self.__buffer.find(b'\n')
+
+    def __dispatch(self, reply: Reply) -> None:
+        """
+        Matches a reply with the oldest command in flight.
+        :param reply: The reply.
+        """
+        with self.__lock:
+            if reply.kind == ReplyKind.UNSOLICITED or len(self.__in_flight) == 0:
+                log.debug("Unsolicited reply from SIS channel `{0}`: {1!r}".format(self.name, reply.raw))
+                return
+
+            exchange = self.__in_flight[0]
+            exchange.replies.append(reply)
+            if len(exchange.replies) < exchange.expected:
+                return
+
+            self.__in_flight.popleft()
+
+        errors = [reply.error() for reply in exchange.replies if reply.kind == ReplyKind.ERROR]
+        if len(errors) > 0:
+            exchange.future.set_exception(errors[0])
+        else:
+            exchange.future.set_result(exchange.replies)
@@ -0,0 +1,10 @@
+class SisError(Exception):
+    pass
+
+
+class SisReplyError(SisError):
+    pass
+
+
+class SisUnexpectedReplyError(SisError):
+    pass
@@ -0,0 +1,188 @@
+from typing import Iterable, List, Union
+from enum import Enum
+import re
+
+from .errors import *
+
+# Extron SIS Replies (Current Understanding)
+#
+# Every SIS command is answered by a single line terminated by CR LF, in the order the commands were received, so
+# replies can be matched to commands simply by counting them.  The replies used by the driver are:
+#
+# - Tie:         `Out<output> In<input> <signal>`, where signal is `All`, `Vid`, `RGB`, or `Aud`.  Some models pad the
+#                channel numbers with zeros.
+# - Quick tie:   `Qik`, once every tie of a quick multiple tie has been made.
+# - Error:       `E<code>`, where code is the two digit error number.
+#
+# The switch may also emit `Reconfig` on its own whenever its configuration is changed from the front panel, which is
+# not a reply to any command.
+
+_TIE_VIDEO = "{0}*{1}%"
+_TIE_AUDIO = "{0}*{1}$"
+_QUICK_TIE = b"\x1B+Q%b\r"  # Quick multiple tie, responds with `Qik` once all the ties are made.
+
+_TIE_PATTERN = re.compile(rb'^Out0*(\d+) In0*(\d+) (All|Vid|RGB|Aud)$')
+_ERROR_PATTERN = re.compile(rb'^E(\d\d)$')
+
+# The known error codes.
+ERROR_MESSAGES = {
+    1: "Invalid input channel number",
+    10: "Invalid command",
+    11: "Invalid preset number",
+    12: "Invalid output number",
+    13: "Invalid value",
+    14: "Illegal command for this configuration",
+    17: "Timeout",
+    21: "Invalid room number",
+    22: "Busy",
+    24: "Privilege violation",
+    25: "Device not present",
+    26: "Maximum number of connections exceeded",
+}
+
+
+class ReplyKind(Enum):
+    """Identifies the kind of reply."""
+
+    TIE = 'tie'              # A tie was made.
+    QUICK_TIE = 'qik'        # A quick multiple tie was made.
+    ERROR = 'error'          # The command failed.
+    UNSOLICITED = 'unsol'    # A notification that is not a reply to any command.
+    OTHER = 'other'          # Any other reply, such as to a query.
+
+
+class Reply:
+    """Represents a reply line from the switch."""
+
+    def __init__(self, raw: bytes, kind: ReplyKind, output_channel: int = 0, input_channel: int = 0,
+                 signal: str = '', code: int = 0):
+        """
+        Initializes a new instance of the Reply class.
+        :param raw:            The raw reply line, without line endings.
+        :param kind:           The kind of reply.
+        :param output_channel: For tie replies, the output channel.
+        :param input_channel:  For tie replies, the input channel.
+        :param signal:         For tie replies, the signal tied; `All`, `Vid`, `RGB`, or `Aud`.
+        :param code:           For error replies, the error code.
+        """
+        self.raw = raw
+        self.kind = kind
+        self.output = output_channel
+        self.input = input_channel
+        self.signal = signal
+        self.code = code
+
+    def __repr__(self) -> str:
+        return "Reply({0!r})".format(self.raw)
+
+    @classmethod
+    def parse(cls, line: bytes):
+        """
+        Parses a reply line.
+        :param line: The reply line, without line endings.
+        :return: The parsed reply.
+        :rtype:  Reply
+        """
+        match = _TIE_PATTERN.match(line)
+        if match is not None:
+            return Reply(line, ReplyKind.TIE, int(match.group(1)), int(match.group(2)), match.group(3).decode())
+
+        if line == b'Qik':
+            return Reply(line, ReplyKind.QUICK_TIE)
+
+        match = _ERROR_PATTERN.match(line)
+        if match is not None:
+            return Reply(line, ReplyKind.ERROR, code=int(match.group(1)))
+
+        if line == b'Reconfig':
+            return Reply(line, ReplyKind.UNSOLICITED)
+
+        return Reply(line, ReplyKind.OTHER)
+
+    def error(self) -> Union[None, SisReplyError]:
+        """
+        Gets the error for an error reply.
+        :return: The error, or None if not an error reply.
+        """
+        if self.kind != ReplyKind.ERROR:
+            return None
+
+        return SisReplyError("E{0:02}: {1}".format(self.code, ERROR_MESSAGES.get(self.code, "Unknown error")))
+
+    def confirms(self, input_channel: int, output_channel: int, signal: str) -> bool:
+        """
+        Determines whether this is the reply for a tie.
+        :param input_channel:  The input channel of the tie.
+        :param output_channel: The output channel of the tie.
+        :param signal:         The signal of the tie; `All`, `Vid`, `RGB`, or `Aud`.
+        :return: True if the reply confirms the tie; otherwise, False.
+        """
+        return (self.kind == ReplyKind.TIE and self.input == input_channel and self.output == output_channel and
+                self.signal == signal)
+
+
+def tie_command(input_channel: int, video_output_channel: int, audio_output_channel: int) -> bytes:
+    """
+    Creates the commands to tie an input to video and audio outputs, they produce two replies.
+    :param input_channel:        The input channel of the tie.
+    :param video_output_channel: The output video channel of the tie.
+    :param audio_output_channel: The output audio channel of the tie.
+    :return: The encoded commands.
+    """
+    return "{0}\r\n{1}".format(_TIE_VIDEO.format(input_channel, video_output_channel),
+                                _TIE_AUDIO.format(input_channel, audio_output_channel)).encode()
+
+
+def quick_tie_part(input_channel: int, video_output_channel: int, audio_output_channel: int) -> bytes:
+    """
+    Creates the part of a quick multiple tie command for one tie.
+    :param input_channel:        The input channel of the tie.
+    :param video_output_channel: The output video channel of the tie.
+    :param audio_output_channel: The output audio channel of the tie.
+    :return: The encoded part.
+    """
+    return (_TIE_VIDEO.format(input_channel, video_output_channel) +
+            _TIE_AUDIO.format(input_channel, audio_output_channel)).encode()
+
+
+def join_quick_tie(parts: Iterable[bytes]) -> bytes:
+    """
+    Creates a quick multiple tie command from the parts for each tie, it produces one reply.
+    :param parts: The encoded parts from `quick_tie_part`.
+    :return: The encoded command.
+    """
+    return _QUICK_TIE % b"".join(parts)
+
+
+def confirm_tie(replies: List[Reply], input_channel: int, video_output_channel: int, audio_output_channel: int) -> None:
+    """
+    Ensures the replies to `tie_command` confirm the tie.
+    :param replies:              The replies.
+    :param input_channel:        The input channel of the tie.
+    :param video_output_channel: The output video channel of the tie.
+    :param audio_output_channel: The output audio channel of the tie.
+    :raises SisUnexpectedReplyError: If the replies are not the ones expected.
+    """
+    _confirm(replies[0].confirms(input_channel, video_output_channel, 'Vid') and
+             replies[1].confirms(input_channel, audio_output_channel, 'Aud'), replies)
+
+
+def confirm_quick_tie(replies: List[Reply]) -> None:
+    """
+    Ensures the reply to a quick multiple tie command, from `join_quick_tie`, confirms the ties.
+    :param replies: The replies.
+    :raises SisUnexpectedReplyError: If the reply is not the one expected.
+    """
+    _confirm(replies[0].kind == ReplyKind.QUICK_TIE, replies)
+
+
+def _confirm(confirmed: bool, replies: List[Reply]) -> None:
+    """
+    Ensures the replies confirm a command.
+    :param confirmed: Whether the replies are the ones expected.
+    :param replies:   The replies, for error reporting.
+    :raises SisUnexpectedReplyError: If the replies are not the ones expected.
+    """
+    if not confirmed:
+        raise SisUnexpectedReplyError("Unexpected reply from Extron switch: {0}".format(
+            ", ".join(reply.raw.decode(errors='replace') for reply in replies)))
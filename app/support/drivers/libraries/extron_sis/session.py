@@ -0,0 +1,221 @@
+from typing import Callable, Dict, List, Union
+from concurrent.futures import Future
+import concurrent.futures
+import socket
+import threading
+import time
+import atexit
+import logging
+
+from .channel import SisChannel
+from .protocol import Reply
+from ....tracing import tracer
+
+log = logging.getLogger(__name__)
+
+# Extron SIS Telnet Sessions
+#
+# Extron switches with a network interface expose SIS over telnet on port 23.  When a connection is opened the switch
+# sends a copyright banner, which may be preceded by an empty line, followed by a line with the date and time.  Only
+# once both have been received will the switch accept commands.  The connection is dropped by the switch after a period
+# of inactivity, five minutes by default, so a benign query is sent periodically to keep the session alive.
+
+
+class SisSession:
+    """Represents a persistent, authenticated telnet session with an Extron SIS switch."""
+
+    PORT = 23                   # The SIS telnet port.
+    TIMEOUT = 10.0              # The number of seconds to wait on the switch before giving up.
+    POLL_INTERVAL = 1.0         # The number of seconds the reader waits for data before checking if it should stop.
+    KEEP_ALIVE_INTERVAL = 60.0  # The number of idle seconds before a keep-alive is sent.
+    KEEP_ALIVE_COMMAND = b"Q"   # Queries the firmware version, which has no side-effects.
+
+    def __init__(self, host: str, port: int = PORT):
+        """
+        Initializes a new instance of the SisSession class.
+        :param host: The host name or address of the switch.
+        :param port: The telnet port of the switch.
+        """
+        self.host = host
+        self.port = port
+        self.__lock = threading.RLock()
+        self.__connection = None  # type: Union[None, socket.socket]
+        self.__channel = None  # type: Union[None, SisChannel]
+        self.__last_activity = 0.0
+        self.reset_listeners = []  # type: List[Callable[[], None]]
+        self.__closed = threading.Event()
+        self.__keep_alive = threading.Thread(target=self.__keep_alive_loop, daemon=True,
+                                             name="sis-keep-alive-{0}".format(host))
+        self.__keep_alive.start()
+
+    @property
+    def connected(self) -> bool:
+        """Determines whether the session currently has an open connection."""
+        return self.__channel is not None and not self.__channel.closed
+
+    def submit(self, command: bytes, replies: int) -> Future:
+        """
+        Writes a command to the switch without waiting on the replies, connecting if needed.
+        :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: A future for the replies.
+        """
+        with self.__lock:
+            channel = self.__connect()
+            self.__last_activity = time.monotonic()
+            return channel.submit(command, replies)
+
+    def send(self, command: bytes, replies: int) -> List[Reply]:
+        """
+        Sends a command to the switch and waits on the replies, connecting or reconnecting as needed.
+        :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: The replies.
+        :raises SisReplyError: If any reply was an error.
+        """
+        try:
+            return self.__send(command, replies)
+        except TimeoutError:
+            # The switch is connected but not answering, sending the command again would only wait just as long.
+            raise
+        except OSError as e:
+            # The switch may have dropped the connection since it was last used, try once more on a new one.
+            log.warning("Lost SIS session with `{0}`, reconnecting: {1}".format(self.host, e))
+            self.__disconnect()
+            return self.__send(command, replies)
+
+    def close(self) -> None:
+        """Closes the session and stops the keep-alive."""
+        self.__closed.set()
+        self.__disconnect()
+
+    def __send(self, command: bytes, replies: int) -> List[Reply]:
+        """
+        Sends a command to the switch and waits on the replies.
+        :param command: The command to send.
+        :param replies: The number of replies the command will produce.
+        :return: The replies.
+        """
+        future = self.submit(command, replies)
+        try:
+            with tracer.span("read", "io", {"host": self.host, "replies": replies}):
+                return future.result(SisSession.TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # A reply went missing, so the remaining replies can no longer be matched with their commands.
+            self.__disconnect()
+            raise TimeoutError("No reply from `{0}`".format(self.host))
+
+    def __connect(self) -> SisChannel:
+        """
+        Opens the connection and waits for the log-in message if not already connected.
+        :return: The channel for the connection.
+        """
+        if self.__channel is not None and not self.__channel.closed:
+            return self.__channel
+
+        self.__disconnect()
+
+        log.info("Opening SIS session with `{0}`".format(self.host))
+        with tracer.span("connect", "io", {"host": self.host, "port": self.port}):
+            connection = socket.create_connection((self.host, self.port), SisSession.TIMEOUT)
+        connection.settimeout(SisSession.POLL_INTERVAL)
+
+        def read() -> bytes:
+            try:
+                chunk = connection.recv(4096)
+            except socket.timeout:
+                return b''
+
+            if len(chunk) == 0:
+                raise ConnectionResetError("Connection closed by the switch")
+
+            return chunk
+
+        # Wait on the log-in message, the copyright banner followed by the date and time.
+        channel = SisChannel(self.host, read, connection.sendall, 2)
+        try:
+            with tracer.span("banner", "io", {"host": self.host}):
+                channel.greeting.result(SisSession.TIMEOUT)
+        except (OSError, concurrent.futures.TimeoutError):
+            channel.close()
+            connection.close()
+            raise TimeoutError("No log-in message from `{0}`".format(self.host))
+
+        self.__connection = connection
+        self.__channel = channel
+        self.__last_activity = time.monotonic()
+
+        # The switch may have been changed by something else while we were not connected.
+        for listener in self.reset_listeners:
+            listener()
+
+        return channel
+
+    def __disconnect(self) -> None:
+        """Closes the current connection, if any."""
+        with self.__lock:
+            channel, connection = self.__channel, self.__connection
+            self.__channel = None
+            self.__connection = None
+
+        if channel is not None:
+            channel.close()
+
+        if connection is not None:
+            try:
+                connection.close()
+            except OSError:
+                pass
+
+    def __keep_alive_loop(self) -> None:
+        """Periodically queries the switch so it does not time out an idle session."""
+        while not self.__closed.wait(SisSession.KEEP_ALIVE_INTERVAL / 4):
+            if not self.connected:
+                # Nothing to keep alive, connections are only made on demand.
+                continue
+
+            if time.monotonic() - self.__last_activity < SisSession.KEEP_ALIVE_INTERVAL:
+                continue
+
+            try:
+                self.__send(SisSession.KEEP_ALIVE_COMMAND, 1)
+            except OSError as e:
+                # Leave it closed, the next command will reconnect.
+                log.warning("SIS keep-alive to `{0}` failed: {1}".format(self.host, e))
+                self.__disconnect()
+
+
+class SessionPool:
+    """Keeps one SIS session per switch host."""
+
+    def __init__(self):
+        """Initializes a new instance of the SessionPool class."""
+        self.__lock = threading.Lock()
+        self.__sessions = {}  # type: Dict[str, SisSession]
+
+    def get(self, host: str, port: int = SisSession.PORT) -> SisSession:
+        """
+        Gets the session for a host, creating it if needed.  The connection itself is only opened on first use.
+        :param host: The host name or address of the switch.
+        :param port: The telnet port of the switch.
+        :return: The session for the host.
+        """
+        key = "{0}:{1}".format(host, port)
+        with self.__lock:
+            if key not in self.__sessions:
+                self.__sessions[key] = SisSession(host, port)
+
+            return self.__sessions[key]
+
+    def close(self) -> None:
+        """Closes all sessions."""
+        with self.__lock:
+            for session in self.__sessions.values():
+                session.close()
+
+            self.__sessions.clear()
+
+
+# The shared sessions.
+sessions = SessionPool()
+atexit.register(sessions.close)
@@ -0,0 +1,281 @@
+from typing import Any, Callable, Dict, Tuple, Union
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+import threading
+import atexit
+import logging
+
+import serial
+
+log = logging.getLogger(__name__)
+
+# The path and line settings of a port; the baud rate, data bits, parity, and stop bits.
+PortKey = Tuple[str, int, int, str, Union[int, float]]
+
+
+class SharedPort:
+    """
+    An open serial port shared by any number of handles.  Writes from all the handles are made by a single writer
+    thread, which takes one write from each handle in turn so no handle can starve the others.
+    """
+
+    READ_TIMEOUT = 1.0  # The number of seconds a read waits for data.
+
+    def __init__(self, key: PortKey):
+        """
+        Initializes a new instance of the SharedPort class, opening the port.
+        :param key: The path and line settings of the port.
+        """
+        self.key = key
+        self.path = key[0]
+        self.port = serial.Serial(*key, timeout=SharedPort.READ_TIMEOUT)
+        self.lock = threading.RLock()
+        self.references = 0
+        self.__attachments = OrderedDict()  # type: OrderedDict[str, Any]
+        self.__condition = threading.Condition()
+        self.__writes = OrderedDict()  # type: OrderedDict[int, deque]
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="serial-{0}".format(self.path))
+        self.__thread.start()
+
+    def submit(self, handle_id: int, data: bytes) -> Future:
+        """
+        Queues data to be written.
+        :param handle_id: The identity of the handle writing the data.
+        :param data:      The data to write.
+        :return: A future for the number of bytes written.
+        """
+        future = Future()
+        with self.__condition:
+            if self.__closed:
+                future.set_exception(serial.SerialException("Port `{0}` is closed".format(self.path)))
+                return future
+
+            self.__writes.setdefault(handle_id, deque()).append((data, future))
+            self.__condition.notify()
+
+        return future
+
+    def attachment(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Gets an object shared by all the handles of the port, such as a reply reader, creating it if needed.  The
+        object is closed along with the port.
+        :param name:    The name of the object.
+        :param factory: Creates the object.
+        :return: The object.
+        """
+        with self.lock:
+            if name not in self.__attachments:
+                self.__attachments[name] = factory()
+
+            return self.__attachments[name]
+
+    def detach(self, name: str, attachment: Any) -> bool:
+        """
+        Removes a shared object, so the next handle to ask for it creates a new one.
+        :param name:       The name of the object.
+        :param attachment: The object, nothing is removed if it was already replaced.
+        :return: True if the object was removed, or False if it was already replaced.
+        """
+        with self.lock:
+            if self.__attachments.get(name) is not attachment:
+                return False
+
+            del self.__attachments[name]
+            return True
+
+    def close(self) -> None:
+        """Closes the port, failing any writes not yet made."""
+        with self.__condition:
+            self.__closed = True
+            pending = [write for writes in self.__writes.values() for write in writes]
+            self.__writes.clear()
+            self.__condition.notify()
+
+        for data, future in pending:
+            future.set_exception(serial.SerialException("Port `{0}` is closed".format(self.path)))
+
+        for attachment in reversed(list(self.__attachments.values())):
+            attachment.close()
+        self.__attachments.clear()
+
+        if self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.port.close()
+
+    def __run(self) -> None:
+        """Makes the queued writes until the port is closed."""
+        while True:
+            with self.__condition:
+                while not self.__closed and len(self.__writes) == 0:
+                    self.__condition.wait()
+
+                if self.__closed:
+                    return
+
+                # Take the next write from the handle that has waited the longest, then send it to the back.
+                handle_id, writes = self.__writes.popitem(last=False)
+                data, future = writes.popleft()
+                if len(writes) > 0:
+                    self.__writes[handle_id] = writes
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self.port.write(data))
+            except Exception as e:
+                log.warning("Write to `{0}` failed: {1}".format(self.path, e))
+                future.set_exception(e)
+
+
+class PortHandle:
+    """A reference to a shared serial port, it must be closed once no longer needed."""
+
+    def __init__(self, registry, shared: SharedPort):
+        """
+        Initializes a new instance of the PortHandle class.
+        :param registry: The registry that opened the port.
+        :param shared:   The shared port.
+        """
+        self.__registry = registry  # type: PortRegistry
+        self.__shared = shared
+        self.__closed = False
+
+    @property
+    def path(self) -> str:
+        """Gets the path to the port."""
+        return self.__shared.path
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Gets the lock shared by all the handles, for exchanges that must not be interleaved with other handles."""
+        return self.__shared.lock
+
+    @property
+    def in_waiting(self) -> int:
+        """Gets the number of bytes waiting to be read."""
+        return self.__shared.port.in_waiting
+
+    def submit(self, data: bytes) -> Future:
+        """
+        Queues data to be written, without waiting on it.
+        :param data: The data to write.
+        :return: A future for the number of bytes written.
+        """
+        return self.__shared.submit(id(self), bytes(data))
+
+    def write(self, data: bytes) -> int:
+        """
+        Writes data, waiting on its turn.
+        :param data: The data to write.
+        :return: The number of bytes written.
+        """
+        return self.submit(data).result()
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Reads up to the number of bytes requested, waiting on them no longer than the read time-out.
+        :param size: The number of bytes to read.
+        :return: The bytes read.
+        """
+        return self.__shared.port.read(size)
+
+    def reset_input_buffer(self) -> None:
+        """Discards any data received but not yet read."""
+        self.__shared.port.reset_input_buffer()
+
+    def attachment(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Gets an object shared by all the handles of the port, creating it if needed.
+        :param name:    The name of the object.
+        :param factory: Creates the object.
+        :return: The object.
+        """
+        return self.__shared.attachment(name, factory)
+
+    def detach(self, name: str, attachment: Any) -> bool:
+        """
+        Removes an object shared by all the handles of the port, so the next handle to ask for it creates a new one.
+        :param name:       The name of the object.
+        :param attachment: The object, nothing is removed if it was already replaced.
+        :return: True if the object was removed, or False if it was already replaced.
+        """
+        return self.__shared.detach(name, attachment)
+
+    def close(self) -> None:
+        """Releases the handle, the port is closed once all its handles are released."""
+        if not self.__closed:
+            self.__closed = True
+            self.__registry.release(self.__shared)
+
+
+class PortRegistry:
+    """Keeps one open port per serial device, shared by all the drivers using it."""
+
+    def __init__(self):
+        """Initializes a new instance of the PortRegistry class."""
+        self.__lock = threading.Lock()
+        self.__ports = {}  # type: Dict[str, SharedPort]
+        self.__opening = {}  # type: Dict[str, threading.Lock]
+
+    def open(self, path: str, baudrate: int, bytesize: int, parity: str, stopbits: Union[int, float]) -> PortHandle:
+        """
+        Gets a handle to a port, opening it if needed.
+        :param path:     The path to the port.
+        :param baudrate: The line speed.
+        :param bytesize: The number of data bits.
+        :param parity:   The parity checking.
+        :param stopbits: The number of stop bits.
+        :return: The handle to the port.
+        :raises ValueError: If the port is already open with other line settings.
+        """
+        key = (path, baudrate, bytesize, parity, stopbits)  # type: PortKey
+        with self.__lock:
+            opening = self.__opening.setdefault(path, threading.Lock())
+
+        # Only one port is opened per path, but different ports may be opened at the same time.
+        with opening:
+            with self.__lock:
+                shared = self.__ports.get(path)
+                if shared is not None:
+                    if shared.key != key:
+                        raise ValueError("Port `{0}` is already open with different line settings".format(path))
+
+                    shared.references = shared.references + 1
+                    return PortHandle(self, shared)
+
+            shared = SharedPort(key)
+            with self.__lock:
+                shared.references = 1
+                self.__ports[path] = shared
+                return PortHandle(self, shared)
+
+    def release(self, shared: SharedPort) -> None:
+        """
+        Releases a reference to a port, closing it if it was the last.
+        :param shared: The shared port.
+        """
+        with self.__lock:
+            shared.references = shared.references - 1
+            if shared.references > 0 or self.__ports.get(shared.path) is not shared:
+                # Still in use, or already closed along with the registry.
+                return
+
+            del self.__ports[shared.path]
+
+        shared.close()
+
+    def close(self) -> None:
+        """Closes all ports."""
+        with self.__lock:
+            ports = list(self.__ports.values())
+            self.__ports.clear()
+
+        for shared in ports:
+            shared.close()
+
+
+# The shared ports.
+ports = PortRegistry()
+atexit.register(ports.close)
@@ -0,0 +1,187 @@
+from typing import Callable, Iterator, List, Union
+import threading
+import logging
+
+from serial import Serial
+
+from .errors import *
+from .protocol import PacketType, CommandBlock, checksum
+
+log = logging.getLogger(__name__)
+
+# Packets are only ever recognized by their type, so that is where the decoder looks for the start of a packet after
+# losing its place in the stream.
+_PACKET_TYPES = frozenset(packet_type.value for packet_type in PacketType)
+
+# A packet is at most the type, size, 255 bytes of data, and the checksum.
+_MAX_PACKET_SIZE = 258
+
+# The largest data of a valid packet, a command block with both arguments.
+_MAX_DATA_SIZE = 6
+
+
+class PacketDecoder:
+    """
+    Decodes command blocks from a stream of bytes received in arbitrary chunks.  The bytes are kept in a fixed buffer
+    which is only compacted once its tail runs out of room, and packets are decoded from views of that buffer, so
+    nothing is allocated per byte or per packet besides the command blocks themselves.  After a bad checksum, the
+    decoder skips ahead one byte at a time until it finds the start of a valid packet.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        """
+        Initializes a new instance of the PacketDecoder class.
+        :param capacity: The size of the receive buffer, it must hold at least one whole packet.
+        """
+        if capacity < _MAX_PACKET_SIZE:
+            raise ValueError("The buffer must hold at least one packet")
+
+        self.__buffer = bytearray(capacity)
+        self.__view = memoryview(self.__buffer)
+        self.__start = 0
+        self.__end = 0
+
+        self.packets = 0          # The number of packets decoded.
+        self.checksum_errors = 0  # The number of packets dropped due to a bad checksum.
+        self.invalid_blocks = 0   # The number of packets dropped since they did not contain a known command block.
+        self.skipped = 0          # The number of bytes skipped while looking for the start of a packet.
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[CommandBlock]:
+        """
+        Adds received bytes and decodes any command blocks now complete.
+        :param data: The bytes received.
+        :return: The command blocks decoded.
+        """
+        blocks = []  # type: List[CommandBlock]
+        data = memoryview(data)
+        while len(data) > 0:
+            count = min(len(data), self.__reserve())
+            self.__view[self.__end:self.__end + count] = data[:count]
+            self.__end = self.__end + count
+            data = data[count:]
+            blocks.extend(self.__decode())
+
+        return blocks
+
+    def read_from(self, connection: Serial) -> List[CommandBlock]:
+        """
+        Reads whatever bytes are available from a connection directly into the buffer, waiting on at least one byte as
+        allowed by the time-out of the connection, and decodes any command blocks now complete.
+        :param connection: The connection from which to read.
+        :return: The command blocks decoded.
+        """
+        count = self.__reserve()
+        count = connection.readinto(self.__view[self.__end:self.__end + min(count, max(connection.in_waiting, 1))])
+        self.__end = self.__end + (count or 0)
+
+        return list(self.__decode())
+
+    def __reserve(self) -> int:
+        """
+        Ensures there is room at the tail of the buffer, moving any partial packet to the front if needed.
+        :return: The number of bytes available at the tail of the buffer.
+        """
+        if self.__end == len(self.__buffer):
+            pending = self.__end - self.__start
+            self.__buffer[:pending] = self.__view[self.__start:self.__end]
+            self.__start = 0
+            self.__end = pending
+
+        return len(self.__buffer) - self.__end
+
+    def __decode(self) -> Iterator[CommandBlock]:
+        """
+        Decodes the complete packets in the buffer.
+        :return: The command blocks decoded.
+        """
+        buffer = self.__buffer
+        while self.__end - self.__start >= 3:
+            start = self.__start
+            if buffer[start] not in _PACKET_TYPES:
+                self.__skip()
+                continue
+
+            size = buffer[start + 1]
+            if size > _MAX_DATA_SIZE:
+                # Not the start of a packet, but the type happened to appear in the stream.
+                self.__skip()
+                continue
+
+            if self.__end - start < size + 3:
+                # Wait on the rest of the packet.
+                return
+
+            data = self.__view[start + 2:start + 2 + size]
+            if checksum(data) != buffer[start + 2 + size]:
+                self.checksum_errors = self.checksum_errors + 1
+                self.__skip()
+                continue
+
+            self.__start = start + size + 3
+            try:
+                block = CommandBlock.parse(data)
+            except CommandBlockError:
+                self.invalid_blocks = self.invalid_blocks + 1
+                continue
+
+            self.packets = self.packets + 1
+            yield block
+
+        if self.__start == self.__end:
+            self.__start = 0
+            self.__end = 0
+
+    def __skip(self) -> None:
+        """Skips a byte that does not start a valid packet."""
+        self.__start = self.__start + 1
+        self.skipped = self.skipped + 1
+
+
+class BusMonitor:
+    """Passively listens to an RS-485 bus, such as for the button presses of a remote control panel."""
+
+    def __init__(self, connection: Serial, name: str = "rs485"):
+        """
+        Initializes a new instance of the BusMonitor class, the connection should have a short read time-out.
+        :param connection: The connection to the bus.
+        :param name:       The name of the monitor, for logging.
+        """
+        self.connection = connection
+        self.name = name
+        self.decoder = PacketDecoder()
+        self.listeners = []  # type: List[Callable[[CommandBlock], None]]
+        self.__running = False
+        self.__thread = None  # type: Union[None, threading.Thread]
+
+    def start(self) -> None:
+        """Starts listening to the bus."""
+        if self.__running:
+            return
+
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="bus-{0}".format(self.name))
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stops listening to the bus."""
+        self.__running = False
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self) -> None:
+        """Reads and dispatches command blocks until stopped."""
+        while self.__running:
+            try:
+                blocks = self.decoder.read_from(self.connection)
+            except Exception as e:
+                log.warning("Lost RS-485 bus `{0}`: {1}".format(self.name, e))
+                self.__running = False
+                return
+
+            for block in blocks:
+                for listener in self.listeners:
+                    try:
+                        listener(block)
+                    except Exception:
+                        log.exception("RS-485 bus `{0}` listener failed".format(self.name))
@@ -1,5 +1,6 @@
-from typing import Union
+from typing import Iterable, Union
 from enum import IntEnum
+import functools
 import io
 
 from serial import Serial
@@ -71,50 +72,92 @@ class Packet:
         :return: The parsed packet.
         :rtype:  Packet
         """
-        packet_type = connection.read(1)
-        if len(packet_type) == 0:
+        header = connection.read(2)
+        if len(header) != 2:
             raise PacketError()
 
-        packet_size = connection.read(1)
-        if len(packet_size) == 0:
+        # The data is followed by the checksum.
+        packet_size = header[1]
+        remainder = connection.read(packet_size + 1)
+        if len(remainder) != packet_size + 1:
             raise PacketError()
 
-        packet_data = connection.read(packet_size[0])
+        return Packet(PacketType(header[0]), remainder[:packet_size], packet_size, remainder[packet_size])
 
-        checksum = connection.read(1)
-        if len(checksum) == 0:
-            raise PacketError()
+    @property
+    def size(self) -> int:
+        """Gets the size of the packet on the wire."""
+        return len(self.data) + 3
+
+    def encode(self) -> bytes:
+        """
+        Encodes the packet as it is sent on the wire.
+        :return: The encoded packet.
+        """
+        frame = bytearray(self.size)
+        self.encode_into(frame, 0)
+        return bytes(frame)
+
+    def encode_into(self, buffer: bytearray, offset: int) -> int:
+        """
+        Encodes the packet into a buffer, which must have room for the whole packet.
+        :param buffer: The buffer.
+        :param offset: The offset in the buffer at which to write the packet.
+        :return: The offset just past the packet.
+        """
+        size = len(self.data)
+        buffer[offset] = self.type
+        buffer[offset + 1] = size
+        buffer[offset + 2:offset + 2 + size] = self.data
+        buffer[offset + 2 + size] = self.__calculate_checksum()
 
-        return Packet(PacketType(packet_type[0]), packet_data, packet_size[0], checksum[0])
+        return offset + 3 + size
 
     def write(self, connection: Union[io.BufferedIOBase, Serial]) -> None:
         """
         Writes a packet to a connection.
         :param connection: The connection to which to write the packet.
         """
-        checksum = self.__calculate_checksum()
-        size = len(self.data)
+        Packet.write_all(connection, [self])
 
-        connection.write(self.type.to_bytes(1, byteorder='big', signed=False))
-        connection.write(size.to_bytes(1, byteorder='big', signed=False))
-        connection.write(self.data)
-        connection.write(checksum.to_bytes(1, byteorder='big', signed=False))
+    @staticmethod
+    def write_all(connection: Union[io.BufferedIOBase, Serial], packets: Iterable[Union['Packet', bytes]]) -> int:
+        """
+        Writes several packets to a connection as a single burst.
+        :param connection: The connection to which to write the packets.
+        :param packets:    The packets, either as Packet objects or already encoded.
+        :return: The number of bytes written.
+        """
+        packets = list(packets)
+        frame = bytearray(sum(len(packet) if isinstance(packet, bytes) else packet.size for packet in packets))
+        offset = 0
+        for packet in packets:
+            if isinstance(packet, bytes):
+                frame[offset:offset + len(packet)] = packet
+                offset = offset + len(packet)
+            else:
+                offset = packet.encode_into(frame, offset)
+
+        connection.write(frame)
+        return len(frame)
 
     def __calculate_checksum(self) -> int:
         """
         Calculates the checksum for a packet.
         :return: The packet checksum.
         """
-        # Sum all bytes.
-        x = 0
-        for byte in self.data:
-            x = x + byte
+        return checksum(self.data)
 
-        # Take only the eight least significant bytes of the two's compliment, and subtract the size, less one byte.
-        x = ~x & 0xFF
-        x = x - (len(self.data) - 1)
 
-        return x
+def checksum(data: Union[bytes, bytearray, memoryview]) -> int:
+    """
+    Calculates the checksum for the data of a packet.
+    :param data: The packet data.
+    :return: The packet checksum.
+    """
+    # Take only the eight least significant bytes of the two's compliment of the sum, and subtract the size, less one;
+    # wrapping around, since the result must still fit in a byte.
+    return ((~sum(data) & 0xFF) - (len(data) - 1)) & 0xFF
 
 
 class AddressKind(IntEnum):
@@ -190,33 +233,29 @@ class CommandBlock:
         :return: The parsed command block.
         :rtype:  CommandBlock
         """
-        stream = io.BytesIO(packet.data)
+        return CommandBlock.parse(packet.data)
 
-        destination = stream.read(1)
-        if len(destination) == 0:
-            raise CommandBlockError()
-
-        source = stream.read(1)
-        if len(source) == 0:
+    @classmethod
+    def parse(cls, data: Union[bytes, bytearray, memoryview]):
+        """
+        Parses a command block from the data of a packet, without copying it.
+        :param data: The packet data.
+        :return: The parsed command block.
+        :rtype:  CommandBlock
+        """
+        size = len(data)
+        if size < 4:
             raise CommandBlockError()
 
-        command = stream.read(2)
-        if len(command) != 2:
+        try:
+            destination_address = Address.read(data[0])
+            source_address = Address.read(data[1])
+            command_id = Command((data[2] << 8) | data[3])
+        except ValueError:
             raise CommandBlockError()
 
-        destination_address = Address.read(destination[0])
-        source_address = Address.read(source[0])
-        command_id = Command(int.from_bytes(command, byteorder='big', signed=False))
-
-        arg0 = stream.read(1)
-        if len(arg0) == 0:
-            return CommandBlock(destination_address, source_address, command_id)
-
-        arg1 = stream.read(1)
-        if len(arg1) == 0:
-            return CommandBlock(destination_address, source_address, command_id, arg0[0])
-
-        return CommandBlock(destination_address, source_address, command_id, arg0[0], arg1[0])
+        return CommandBlock(destination_address, source_address, command_id, data[4] if size > 4 else -1,
+                            data[5] if size > 5 else -1)
 
     def package(self) -> Packet:
         """
@@ -234,3 +273,17 @@ class CommandBlock:
 
         data = stream.getbuffer().tobytes()
         return Packet(PacketType.TRANSPORT_CONTROL, data)
+
+
+@functools.lru_cache(maxsize=None)
+def encode_command(destination: int, source: int, command: Command, arg0: int = -1, arg1: int = -1) -> bytes:
+    """
+    Encodes a command block packet.  The command space is small, so each encoding is only ever built once.
+    :param destination: The raw destination address.
+    :param source:      The raw source address.
+    :param command:     The command.
+    :param arg0:        The first argument of the command, if applicable.
+    :param arg1:        The second argument of the command, if applicable.
+    :return: The encoded packet.
+    """
+    return CommandBlock(Address.read(destination), Address.read(source), command, arg0, arg1).package().encode()
@@ -0,0 +1,213 @@
+from typing import Dict, List, Tuple, Union
+import os
+import time
+import threading
+import contextlib
+import atexit
+import logging
+
+log = logging.getLogger(__name__)
+
+# The upper bounds, in seconds, of the latency histogram buckets, from a quick serial write to a slow reconnection.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Counts observations into cumulative buckets, as Prometheus expects."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initializes a new instance of the Histogram class.
+        :param buckets: The upper bounds of the buckets, in increasing order.
+        """
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)  # type: List[int]
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Adds an observation.
+        :param value: The value observed.
+        """
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] = self.counts[index] + 1
+                break
+
+        self.count = self.count + 1
+        self.sum = self.sum + value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Gets the cumulative count of each bucket, ending with the count of all observations.
+        :return: The bound, as a label, and count of each bucket.
+        """
+        result = []  # type: List[Tuple[str, int]]
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total = total + count
+            result.append((repr(bound), total))
+
+        result.append(("+Inf", self.count))
+        return result
+
+
+class SwitchMetrics:
+    """The command counts, errors, latencies, and bytes written of a switch."""
+
+    def __init__(self, switch_id: str):
+        """
+        Initializes a new instance of the SwitchMetrics class.
+        :param switch_id: The identifier of the switch.
+        """
+        self.switch_id = switch_id
+        self.commands = {}  # type: Dict[str, int]
+        self.errors = {}  # type: Dict[str, int]
+        self.latency = {}  # type: Dict[str, Histogram]
+        self.bytes_written = 0
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self, command: str, driver):
+        """
+        Measures a command sent to the switch.
+        :param command: The name of the command, such as `tie` or `power_on`.
+        :param driver:  The driver of the switch, whose written bytes are counted.
+        """
+        written = driver.bytes_written
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.commands[command] = self.commands.get(command, 0) + 1
+                if failed:
+                    self.errors[command] = self.errors.get(command, 0) + 1
+                self.latency.setdefault(command, Histogram()).observe(elapsed)
+                self.bytes_written = self.bytes_written + max(driver.bytes_written - written, 0)
+
+
+class MetricsRegistry:
+    """Keeps the metrics of every switch, and writes them as a Prometheus text file."""
+
+    WRITE_INTERVAL = 15.0  # The number of seconds between writes of the metrics file.
+
+    def __init__(self):
+        """Initializes a new instance of the MetricsRegistry class."""
+        self.__lock = threading.Lock()
+        self.__switches = {}  # type: Dict[str, SwitchMetrics]
+        self.__path = None  # type: Union[None, str]
+
+    def get(self, switch_id: str) -> SwitchMetrics:
+        """
+        Gets the metrics of a switch, a switch replaced by a reload keeps the metrics of the one before it.
+        :param switch_id: The identifier of the switch.
+        :return: The metrics of the switch.
+        """
+        with self.__lock:
+            if switch_id not in self.__switches:
+                self.__switches[switch_id] = SwitchMetrics(switch_id)
+
+            return self.__switches[switch_id]
+
+    def render(self) -> str:
+        """
+        Renders the metrics in the Prometheus text format.
+        :return: The metrics.
+        """
+        with self.__lock:
+            switches = sorted(self.__switches.values(), key=lambda item: item.switch_id)
+
+        commands = []  # type: List[str]
+        errors = []  # type: List[str]
+        written = []  # type: List[str]
+        latency = []  # type: List[str]
+        for metrics in switches:
+            switch = 'switch="{0}"'.format(_escape(metrics.switch_id))
+            with metrics.lock:
+                written.append("piavswictrl_switch_written_bytes_total{{{0}}} {1}".format(
+                    switch, metrics.bytes_written))
+                for command, count in sorted(metrics.commands.items()):
+                    labels = '{0},command="{1}"'.format(switch, _escape(command))
+                    commands.append("piavswictrl_switch_commands_total{{{0}}} {1}".format(labels, count))
+                    errors.append("piavswictrl_switch_errors_total{{{0}}} {1}".format(
+                        labels, metrics.errors.get(command, 0)))
+
+                    histogram = metrics.latency[command]
+                    for bound, count_le in histogram.cumulative():
+                        latency.append('piavswictrl_switch_command_seconds_bucket{{{0},le="{1}"}} {2}'.format(
+                            labels, bound, count_le))
+                    latency.append("piavswictrl_switch_command_seconds_sum{{{0}}} {1!r}".format(labels, histogram.sum))
+                    latency.append("piavswictrl_switch_command_seconds_count{{{0}}} {1}".format(
+                        labels, histogram.count))
+
+        lines = [
+            "# HELP piavswictrl_switch_commands_total Commands sent to each switch.",
+            "# TYPE piavswictrl_switch_commands_total counter",
+        ] + commands + [
+            "# HELP piavswictrl_switch_errors_total Commands that failed on each switch.",
+            "# TYPE piavswictrl_switch_errors_total counter",
+        ] + errors + [
+            "# HELP piavswictrl_switch_written_bytes_total Bytes written to each switch.",
+            "# TYPE piavswictrl_switch_written_bytes_total counter",
+        ] + written + [
+            "# HELP piavswictrl_switch_command_seconds Time taken by the commands sent to each switch.",
+            "# TYPE piavswictrl_switch_command_seconds histogram",
+        ] + latency
+
+        return "\n".join(lines) + "\n"
+
+    def write(self) -> None:
+        """Writes the metrics file, so that it only appears once it is complete."""
+        if self.__path is None:
+            return
+
+        temporary_path = "{0}.{1}.tmp".format(self.__path, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(self.__path), exist_ok=True)
+            with open(temporary_path, "w") as metrics_file:
+                metrics_file.write(self.render())
+            os.replace(temporary_path, self.__path)
+        except OSError as e:
+            log.warning("Failed to write the metrics to `{0}`: {1}".format(self.__path, e))
+
+    def start(self, path: str, interval: float = WRITE_INTERVAL) -> None:
+        """
+        Starts writing the metrics file periodically, and once more at exit.
+        :param path:     The path to the metrics file.
+        :param interval: The number of seconds between writes.
+        """
+        if self.__path is not None:
+            return
+
+        self.__path = path
+        atexit.register(self.write)
+        threading.Thread(target=self.__run, args=(interval,), daemon=True, name="metrics").start()
+
+    def __run(self, interval: float) -> None:
+        """
+        Writes the metrics file periodically.
+        :param interval: The number of seconds between writes.
+        """
+        while True:
+            time.sleep(interval)
+            self.write()
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes a label value.
+    :param value: The value.
+    :return: The escaped value.
+    """
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# The metrics of all the switches.
+metrics = MetricsRegistry()
@@ -0,0 +1,222 @@
+from typing import Any, Dict, List, Tuple, Union
+from concurrent.futures import Future
+import os
+import sys
+import marshal
+import hashlib
+import threading
+import logging
+
+from state import State
+from .config import parse_config
+from .Switch import Switch, switches, load_switches
+from .Device import CompiledDevice, Device, devices, load_devices, restore_devices
+
+log = logging.getLogger(__name__)
+
+# The version of the snapshot format, change this whenever the compiled form of the configuration changes.
+_FORMAT = 1
+
+# The switch configuration, which the drivers still read, and the compiled devices.
+Snapshot = Tuple[Dict[str, Dict[str, Any]], List[CompiledDevice]]
+
+# The modification time and size of a configuration file.
+FileStamp = Tuple[int, int]
+
+# The key of the configuration loaded, and the stamp of the file it was read from.
+_loaded_key = ""
+_loaded_stamp = (0, 0)  # type: FileStamp
+
+
+def load() -> None:
+    """
+    Loads the switches and devices, from the compiled snapshot of the configuration if the configuration has not
+    changed since; otherwise, the configuration is parsed and validated, then compiled into a new snapshot.
+    """
+    global _loaded_key, _loaded_stamp
+
+    data, _loaded_stamp = _read_config()
+    _loaded_key = _get_key(data)
+    snapshot = _read(_loaded_key)
+    if snapshot is not None:
+        switch_config, compiled_devices = snapshot
+        load_switches(switch_config)
+        restore_devices(compiled_devices)
+        return
+
+    config = parse_config(data)
+    load_switches(config['switches'])
+    load_devices(config['devices'])
+    _write(_loaded_key, (config['switches'], [device.compile() for device in devices]))
+
+
+def changed() -> bool:
+    """
+    Determines whether the configuration file may have changed since it was loaded, by its modification time and size.
+    :return: True if the file has changed; otherwise, False.
+    """
+    try:
+        status = os.stat(State.current.config_file_path)
+    except OSError:
+        return False
+
+    return (status.st_mtime_ns, status.st_size) != _loaded_stamp
+
+
+def reload() -> bool:
+    """
+    Reloads the configuration.  Only the switches whose configuration changed are replaced, the others keep their
+    connections and routes, and the devices that did not change are kept as they are.  If the configuration is not
+    valid, the current switches and devices stay loaded.
+    :return: True if the configuration changed; otherwise, False.
+    """
+    global _loaded_key, _loaded_stamp
+
+    data, _loaded_stamp = _read_config()
+    key = _get_key(data)
+    if key == _loaded_key:
+        return False
+
+    config = parse_config(data)
+    current_switches = dict(switches)
+    new_switches = {}  # type: Dict[str, Switch]
+    try:
+        for switch_id, switch_config in config['switches'].items():
+            switch = current_switches.get(switch_id)
+            if switch is None or switch.config != switch_config:
+                switch = Switch(switch_id, switch_config)
+            new_switches[switch_id] = switch
+
+        # The ties of the devices look up their switches as they are loaded.
+        switches.clear()
+        switches.update(new_switches)
+        new_devices = [Device(index, device_config) for index, device_config in enumerate(config['devices'])]
+    except Exception:
+        switches.clear()
+        switches.update(current_switches)
+        for switch_id, switch in new_switches.items():
+            if current_switches.get(switch_id) is not switch:
+                switch.close()
+        raise
+
+    # Keep the devices that did not change, along with their switches, so their buttons need not change.
+    current_devices = {_get_device_key(device.compile()): device for device in devices}
+    for index, device in enumerate(new_devices):
+        current = current_devices.get(_get_device_key(device.compile()))
+        if current is not None and all(switches.get(tie.switch.id) is tie.switch for tie in current.ties):
+            current.id = index
+            new_devices[index] = current
+
+    devices[:] = new_devices
+    closing = [switch.close() for switch_id, switch in current_switches.items()
+               if new_switches.get(switch_id) is not switch]
+    starting = [switch for switch_id, switch in new_switches.items() if current_switches.get(switch_id) is not switch]
+    _start_when_closed(closing, starting)
+
+    _loaded_key = key
+    _write(key, (config['switches'], [device.compile() for device in devices]))
+    return True
+
+
+def _start_when_closed(closing: List[Future], starting: List[Switch]) -> None:
+    """
+    Starts new switches once the switches they replace are closed, since a replaced switch may still hold a serial port
+    that its replacement opens with other line settings.
+    :param closing:  The futures for closing the replaced switches.
+    :param starting: The switches to start.
+    """
+    def start() -> None:
+        for switch in starting:
+            log.info("Starting `{0}` with its new configuration".format(switch.title))
+            switch.start()
+
+    if len(closing) == 0:
+        start()
+        return
+
+    lock = threading.Lock()
+    remaining = [len(closing)]
+
+    # noinspection PyUnusedLocal
+    def on_closed(future: Future) -> None:
+        with lock:
+            remaining[0] = remaining[0] - 1
+            if remaining[0] > 0:
+                return
+
+        start()
+
+    for closed in closing:
+        closed.add_done_callback(on_closed)
+
+
+def _read_config() -> Tuple[bytes, FileStamp]:
+    """
+    Reads the configuration file.
+    :return: The contents of the file, and its stamp.
+    """
+    with open(State.current.config_file_path, "rb") as config_file:
+        status = os.fstat(config_file.fileno())
+        return config_file.read(), (status.st_mtime_ns, status.st_size)
+
+
+def _get_device_key(compiled: CompiledDevice) -> Tuple[Any, ...]:
+    """
+    Gets a key to compare devices by.
+    :param compiled: The compiled device.
+    :return: The key of the device.
+    """
+    title, image, ties = compiled
+    return title, image, tuple(tuple(tie) for tie in ties)
+
+
+def _get_path() -> str:
+    """
+    Gets the path to the snapshot.
+    :return: The path to the snapshot.
+    """
+    return os.path.join(State.current.cache_dir, "config.snapshot")
+
+
+def _get_key(data: bytes) -> str:
+    """
+    Gets the key of a snapshot for the configuration, a snapshot is only used when its key matches.  The path of the
+    configuration file is part of the key, since the image paths in the snapshot are resolved against its directory.
+    :param data: The contents of the configuration file.
+    :return: The key of the snapshot.
+    """
+    digest = hashlib.sha1(data).hexdigest()
+    return "{0}:{1}:{2}:{3}:{4}".format(_FORMAT, State.current.version, sys.version,
+                                        os.path.abspath(State.current.config_file_path), digest)
+
+
+def _read(key: str) -> Union[None, Snapshot]:
+    """
+    Reads the snapshot.
+    :param key: The key of the snapshot for the current configuration.
+    :return: The snapshot, or None if there is none for the current configuration.
+    """
+    try:
+        with open(_get_path(), "rb") as snapshot_file:
+            snapshot_key, snapshot = marshal.load(snapshot_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    return snapshot if snapshot_key == key else None
+
+
+def _write(key: str, snapshot: Snapshot) -> None:
+    """
+    Writes the snapshot, so that it only appears once it is complete.
+    :param key:      The key of the snapshot for the current configuration.
+    :param snapshot: The snapshot.
+    """
+    path = _get_path()
+    temporary_path = "{0}.{1}.tmp".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as snapshot_file:
+            marshal.dump((key, snapshot), snapshot_file)
+        os.replace(temporary_path, path)
+    except (OSError, ValueError) as e:
+        log.warning("Failed to save the configuration snapshot: {0}".format(e))
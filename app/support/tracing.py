@@ -0,0 +1,164 @@
+from typing import Any, Dict, List, Tuple, Union
+from collections import deque
+import os
+import json
+import time
+import threading
+import itertools
+import contextlib
+import contextvars
+
+# Tracing
+#
+# Spans time the steps of a selection, from the button press through each tie to the bytes written to, and the replies
+# read from, the switches.  The open spans are kept in a context variable, so each thread, and each coroutine, has its
+# own; a span opened while another is open is its child.  Work handed to another thread, such as the command worker, a
+# switch's command queue, or the event loop, carries the span that was open when it was queued and resumes it, so the
+# spans opened by that work are still children of the button press.
+#
+# Only the most recent spans are kept, and they can be dumped in the Chrome trace event format, to be opened with
+# `chrome://tracing` or Perfetto.
+
+
+class Span:
+    """A timed step of the work."""
+
+    def __init__(self, span_id: int, parent: Union[None, 'Span'], name: str, category: str, args: Dict[str, Any]):
+        """
+        Initializes a new instance of the Span class, starting it.
+        :param span_id:  The identifier of the span.
+        :param parent:   The span this is part of, if any.
+        :param name:     The name of the span.
+        :param category: The category of the span, such as `ui`, `switch`, or `io`.
+        :param args:     Details about the span.
+        """
+        self.id = span_id
+        self.parent_id = parent.id if parent is not None else None  # type: Union[None, int]
+        self.name = name
+        self.category = category
+        self.args = args
+        thread = threading.current_thread()
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+
+class Tracer:
+    """Records spans in a ring buffer."""
+
+    CAPACITY = 4096  # The number of most recent spans kept.
+
+    def __init__(self, capacity: int = CAPACITY):
+        """
+        Initializes a new instance of the Tracer class.
+        :param capacity: The number of most recent spans kept.
+        """
+        self.__spans = deque(maxlen=capacity)  # type: deque[Span]
+        self.__ids = itertools.count(1)
+        self.__lock = threading.Lock()
+        self.__open = contextvars.ContextVar("spans", default=())  # type: contextvars.ContextVar[Tuple[Span, ...]]
+        self.__epoch = time.perf_counter()
+
+    def current(self) -> Union[None, Span]:
+        """
+        Gets the innermost open span of the current thread or coroutine.
+        :return: The span, or None if there is no open span.
+        """
+        stack = self.__open.get()
+        return stack[-1] if len(stack) > 0 else None
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str, args: Dict[str, Any] = None):
+        """
+        Times a step of the work, any error raised by the step is recorded with it.
+        :param name:     The name of the span.
+        :param category: The category of the span, such as `ui`, `switch`, or `io`.
+        :param args:     Details about the span.
+        """
+        with self.__lock:
+            span_id = next(self.__ids)
+
+        stack = self.__open.get()
+        span = Span(span_id, stack[-1] if len(stack) > 0 else None, name, category, dict(args or {}))
+        token = self.__open.set(stack + (span,))
+        try:
+            yield span
+        except BaseException as e:
+            span.args["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            self.__open.reset(token)
+            self.__spans.append(span)
+
+    @contextlib.contextmanager
+    def resume(self, parent: Union[None, Span]):
+        """
+        Resumes a span from another thread, so the spans opened within are its children.
+        :param parent: The span, as given by `current` on the other thread, or None for the spans opened within to have
+                       no parent.
+        """
+        token = self.__open.set((parent,) if parent is not None else ())
+        try:
+            yield
+        finally:
+            self.__open.reset(token)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """
+        Gets the kept spans as Chrome trace events.
+        :return: The events.
+        """
+        spans = list(self.__spans)
+        by_id = {span.id: span for span in spans}
+        pid = os.getpid()
+        events = []  # type: List[Dict[str, Any]]
+        threads = {}  # type: Dict[int, str]
+        for span in spans:
+            threads[span.thread_id] = span.thread_name
+            args = dict(span.args)
+            args["span"] = span.id
+            if span.parent_id is not None:
+                args["parent"] = span.parent_id
+
+            timestamp = self.__timestamp(span.start)
+            events.append({"name": span.name, "cat": span.category, "ph": "X", "ts": timestamp,
+                           "dur": span.duration * 1000000, "pid": pid, "tid": span.thread_id, "args": args})
+
+            # Draw an arrow from a parent on another thread, such as the button press, to the span.
+            parent = by_id.get(span.parent_id)
+            if parent is not None and parent.thread_id != span.thread_id:
+                events.append({"name": span.name, "cat": span.category, "ph": "s", "id": span.id,
+                               "ts": self.__timestamp(parent.start), "pid": pid, "tid": parent.thread_id})
+                events.append({"name": span.name, "cat": span.category, "ph": "f", "bp": "e", "id": span.id,
+                               "ts": timestamp, "pid": pid, "tid": span.thread_id})
+
+        for thread_id, thread_name in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                           "args": {"name": thread_name}})
+
+        return events
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the kept spans to a file in the Chrome trace event format.
+        :param path: The path to the file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = "{0}.{1}.tmp".format(path, os.getpid())
+        with open(temporary_path, "w") as trace_file:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, trace_file)
+        os.replace(temporary_path, path)
+
+    def __timestamp(self, moment: float) -> float:
+        """
+        Converts a time to a trace timestamp.
+        :param moment: The time, from `time.perf_counter`.
+        :return: The number of microseconds since the tracer was created.
+        """
+        return (moment - self.__epoch) * 1000000
+
+
+# The shared tracer.
+tracer = Tracer()
@@ -0,0 +1,98 @@
+from typing import Tuple
+import os
+import hashlib
+import tempfile
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class ButtonImageCache:
+    """
+    Keeps the rendered normal and selected images of each button on disk, so they only need to be rendered once rather
+    than on every start.  Images larger than the button are scaled down to fit it.  The renders are keyed by the path,
+    modification time, and size of the source image, along with the brightness of the normal image and the size of
+    the button, so any change to one of those renders it again.
+    """
+
+    NORMAL_BRIGHTNESS = 0.66  # The brightness of the normal image, relative to the selected image.
+
+    def __init__(self, directory: str, size: int, brightness: float = NORMAL_BRIGHTNESS):
+        """
+        Initializes a new instance of the ButtonImageCache class.
+        :param directory:  The directory for the rendered images.
+        :param size:       The largest width and height, in pixels, of the rendered images.
+        :param brightness: The brightness of the normal image.
+        """
+        self.directory = directory
+        self.size = size
+        self.brightness = brightness
+
+    def get(self, image_path: str) -> Tuple[str, str]:
+        """
+        Gets the rendered images for a button, rendering them if needed.
+        :param image_path: The path to the source image.
+        :return: The paths to the normal and selected images, both PNG images that Tk can load on its own.
+        """
+        normal_path, selected_path = self.__get_paths(image_path)
+        if not (os.path.isfile(normal_path) and os.path.isfile(selected_path)):
+            self.__render(image_path, normal_path, selected_path)
+
+        return normal_path, selected_path
+
+    def __get_paths(self, image_path: str) -> Tuple[str, str]:
+        """
+        Gets the paths of the rendered images for a source image.
+        :param image_path: The path to the source image.
+        :return: The paths to the normal and selected images.
+        """
+        image_path = os.path.realpath(image_path)
+        status = os.stat(image_path)
+        key = "{0}|{1}|{2}|{3}|{4}".format(image_path, status.st_mtime_ns, status.st_size, self.brightness, self.size)
+        name = hashlib.sha1(key.encode()).hexdigest()
+
+        return (os.path.join(self.directory, "{0}-normal.png".format(name)),
+                os.path.join(self.directory, "{0}-selected.png".format(name)))
+
+    def __render(self, image_path: str, normal_path: str, selected_path: str) -> None:
+        """
+        Renders the images for a button.
+        :param image_path:    The path to the source image.
+        :param normal_path:   The path for the normal image.
+        :param selected_path: The path for the selected image.
+        """
+        # Only needed when the images are not already rendered.
+        from PIL import Image, ImageEnhance
+
+        log.info("Rendering button images for `{0}`".format(image_path))
+        os.makedirs(self.directory, exist_ok=True)
+        with Image.open(image_path) as source:
+            # JPEG images can be decoded at close to the button size to begin with, others ignore this.
+            source.draft("RGB", (self.size, self.size))
+
+            # Brightness only works on plain grey-scale and colour images.
+            image = source if source.mode in ("L", "RGB", "RGBA") else source.convert("RGBA")
+            image.load()
+            if image.width > self.size or image.height > self.size:
+                image.thumbnail((self.size, self.size), Image.LANCZOS)
+
+            normal = ImageEnhance.Brightness(image).enhance(self.brightness)
+            ButtonImageCache.__save(normal, normal_path)
+            ButtonImageCache.__save(image, selected_path)
+
+    @staticmethod
+    def __save(image, path: str) -> None:
+        """
+        Saves a rendered image, so that it only appears once it is complete.
+        :param image: The image.
+        :param path:  The path for the image.
+        """
+        # The images may be rendered on several threads at once, so each needs its own temporary file.
+        handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as image_file:
+                image.save(image_file, "PNG")
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
@@ -0,0 +1,97 @@
+from typing import Any, Callable, Tuple, Union
+from concurrent.futures import Future
+import functools
+import queue
+import threading
+import logging
+
+from ..support.tracing import tracer
+
+log = logging.getLogger(__name__)
+
+# Called with the command result, or the error it raised, once a command completes.
+CompletionCallback = Callable[[Any, Union[None, Exception]], None]
+
+
+class CommandWorker:
+    """Runs switch commands on a background thread so the user interface never waits on the hardware."""
+
+    def __init__(self):
+        """Initializes a new instance of the CommandWorker class."""
+        self.__commands = queue.Queue()  # type: queue.Queue
+        self.__completions = queue.Queue()  # type: queue.Queue
+        self.__pending = 0
+        self.__lock = threading.Lock()
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="command-worker")
+        self.__thread.start()
+
+    @property
+    def busy(self) -> bool:
+        """Determines whether any posted commands have not had their completion handled."""
+        with self.__lock:
+            return self.__pending > 0
+
+    def post(self, command: Callable[[], Any], callback: Union[None, CompletionCallback] = None) -> None:
+        """
+        Queues a command to run on the worker thread.
+        :param command:  The command to run, if it returns a future, the command completes with the future.
+        :param callback: Called from `poll` with the result or error once the command completes.
+        """
+        with self.__lock:
+            self.__pending = self.__pending + 1
+
+        # The command is part of whatever the posting thread is doing, such as a button press.
+        self.__commands.put((command, callback, tracer.current()))
+
+    def poll(self) -> None:
+        """Handles the completed commands, this must be called from the thread that owns the callbacks."""
+        while True:
+            try:
+                completion = self.__completions.get_nowait()  # type: Tuple[CompletionCallback, Any, Exception]
+            except queue.Empty:
+                return
+
+            callback, result, error = completion
+
+            with self.__lock:
+                self.__pending = self.__pending - 1
+
+            if callback is not None:
+                callback(result, error)
+
+    def stop(self) -> None:
+        """Stops the worker after any queued commands."""
+        self.__commands.put(None)
+
+    def __run(self) -> None:
+        """Runs queued commands until stopped."""
+        while True:
+            item = self.__commands.get()
+            if item is None:
+                return
+
+            command, callback, parent = item
+            try:
+                with tracer.resume(parent):
+                    result = command()
+            except Exception as e:
+                log.exception(e)
+                self.__completions.put((callback, None, e))
+                continue
+
+            if isinstance(result, Future):
+                # Don't hold up the next command, complete once the future does.
+                result.add_done_callback(functools.partial(self.__complete, callback))
+            else:
+                self.__completions.put((callback, result, None))
+
+    def __complete(self, callback: Union[None, CompletionCallback], future: Future) -> None:
+        """
+        Completes a command that returned a future.
+        :param callback: The completion callback of the command.
+        :param future:   The completed future.
+        """
+        try:
+            self.__completions.put((callback, future.result(), None))
+        except Exception as e:
+            self.__completions.put((callback, None, e))
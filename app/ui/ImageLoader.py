@@ -0,0 +1,100 @@
+from typing import Callable, Dict, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor, Future
+import functools
+import queue
+import threading
+import logging
+
+from .ButtonImageCache import ButtonImageCache
+
+log = logging.getLogger(__name__)
+
+# Called with the paths to the normal and selected images, or the error raised loading them, once they are ready.
+ImageCallback = Callable[[Union[None, Tuple[str, str]], Union[None, Exception]], None]
+
+
+class ImageLoader:
+    """
+    Decodes, resizes, and renders the button images on a pool of background threads, so large images never hold up
+    the user interface.  An image requested again while it is still being rendered shares that render.  Like the
+    command worker, the results are handed back to the user interface from `poll`.
+    """
+
+    WORKERS = 2  # The number of images rendered at once.
+
+    def __init__(self, cache: ButtonImageCache, workers: int = WORKERS):
+        """
+        Initializes a new instance of the ImageLoader class.
+        :param cache:   The cache of rendered images.
+        :param workers: The number of images rendered at once.
+        """
+        self.cache = cache
+        self.__pool = ThreadPoolExecutor(max_workers=workers)
+        self.__completions = queue.Queue()  # type: queue.Queue
+        self.__pending = 0
+        self.__rendering = {}  # type: Dict[str, Future]
+        self.__lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        """Determines whether any images have not had their completion handled."""
+        with self.__lock:
+            return self.__pending > 0
+
+    def load(self, image_path: str, callback: ImageCallback) -> None:
+        """
+        Queues an image to be rendered.
+        :param image_path: The path to the source image.
+        :param callback:   Called from `poll` with the paths to the rendered images, or the error, once ready.
+        """
+        with self.__lock:
+            self.__pending = self.__pending + 1
+            future = self.__rendering.get(image_path)
+            started = future is None
+            if started:
+                future = self.__pool.submit(self.cache.get, image_path)
+                self.__rendering[image_path] = future
+
+        if started:
+            future.add_done_callback(functools.partial(self.__rendered, image_path))
+        future.add_done_callback(functools.partial(self.__complete, image_path, callback))
+
+    def poll(self) -> None:
+        """Handles the loaded images, this must be called from the thread that owns the callbacks."""
+        while True:
+            try:
+                callback, paths, error = self.__completions.get_nowait()
+            except queue.Empty:
+                return
+
+            with self.__lock:
+                self.__pending = self.__pending - 1
+
+            callback(paths, error)
+
+    def stop(self) -> None:
+        """Stops the loader, abandoning any images not yet started."""
+        self.__pool.shutdown(wait=False)
+
+    def __rendered(self, image_path: str, future: Future) -> None:
+        """
+        Forgets the render of an image once it is done, so a later request checks the cache again.
+        :param image_path: The path to the source image.
+        :param future:     The completed future.
+        """
+        with self.__lock:
+            if self.__rendering.get(image_path) is future:
+                del self.__rendering[image_path]
+
+    def __complete(self, image_path: str, callback: ImageCallback, future: Future) -> None:
+        """
+        Completes the loading of an image.
+        :param image_path: The path to the source image.
+        :param callback:   The completion callback of the image.
+        :param future:     The completed future.
+        """
+        try:
+            self.__completions.put((callback, future.result(), None))
+        except Exception as e:
+            log.error("Failed to render `{0}`: {1}".format(image_path, e))
+            self.__completions.put((callback, None, e))
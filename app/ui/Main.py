@@ -1,16 +1,22 @@
-from typing import List, Dict, Union, Callable
+from typing import List, Dict, Tuple, Union, Callable, Any
 import os
+import time
 import functools
+import logging
+import concurrent.futures
 
 import tkinter as tk
-import numpy as np
-from PIL import Image, ImageEnhance, ImageTk
 
 from state import State
 from ..support.Device import devices, Device
 from ..support.Switch import switches
+from ..support import snapshot
+from ..support.tracing import tracer
+from .CommandWorker import CommandWorker
+from .ButtonImageCache import ButtonImageCache
+from .ImageLoader import ImageLoader
 
-ButtonTarget = Union[None, Device, Image.Image]
+log = logging.getLogger(__name__)
 
 
 class Colors:
@@ -23,126 +29,332 @@ class Colors:
 class Main(tk.Tk):
     """The main window."""
 
+    IDLE_POLL_INTERVAL = 500  # The idle poll interval, in milliseconds, when no commands are running.
+    BUSY_POLL_INTERVAL = 20   # The idle poll interval, in milliseconds, while waiting for commands to complete.
+    CELL_SIZE = 130           # The space, in pixels, given to each button in the grid.
+    CONFIG_CHECK_INTERVAL = 2.0  # The interval, in seconds, between checks for changes to the configuration file.
+
     def __init__(self):
         super().__init__()
-        self.after_idle(self.__idle_poll)
+        self.__worker = CommandWorker()
+        self.__poll_id = self.after_idle(self.__idle_poll)
         self.title('Pi Game Switch')
         self.attributes('-fullscreen', True)
+        # The images are scaled to fit the cells, less their padding.
+        image_cache = ButtonImageCache(os.path.join(State.current.cache_dir, "buttons"), Main.CELL_SIZE - 2)
+        self.__images = ImageLoader(image_cache)
         self.__normal_images = {}  # type: Dict[tk.Button, tk.PhotoImage]
         self.__selected_images = {}  # type: Dict[tk.Button, tk.PhotoImage]
         self.__buttons = []  # type: List[tk.Button]
+        self.__slots = []  # type: List[tk.Button]
+        self.__slot_devices = {}  # type: Dict[tk.Button, Device]
+        self.__waiting = []  # type: List[Tuple[tk.Button, Device]]
         self.__frame = tk.Frame(self, cursor='none', background=Colors.FRAME)
         self.__selected = None  # type: Union[None, tk.Button]
+        self.__selected_device = None  # type: Union[None, Device]
+        self.__previous_button = None  # type: Union[None, tk.Button]
+        self.__next_button = None  # type: Union[None, tk.Button]
+        self.__page = 0
+        self.__page_size = 0
+        self.__next_config_check = time.monotonic() + Main.CONFIG_CHECK_INTERVAL
 
         # Configure the layout
         self.__frame.grid(column=0, row=0, sticky=(tk.N, tk.W, tk.E, tk.S))
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
 
-        # Get the number of columns we will have.
-        columns = int(self.winfo_screenwidth() / 130)
+        # Get the number of columns and rows we will have, the last cell is always the power off button.
+        self.__columns = max(int(self.winfo_screenwidth() / Main.CELL_SIZE), 1)
+        self.__cells = self.__columns * max(int(self.winfo_screenheight() / Main.CELL_SIZE), 1)
+
+        def power_off():
+            def all_off():
+                concurrent.futures.wait([switch.queue_power_off() for switch in switches.values()])
+
+            # noinspection PyUnusedLocal
+            def done(result: Any, error: Union[None, Exception]) -> None:
+                State.current.shutting_down = True
+                self.after_idle(self.destroy)
+
+            self.__post(all_off, done)
+
+        # noinspection SpellCheckingInspection
+        power_off_image_path = os.path.abspath(os.path.join(os.path.dirname(__file__), './res/poweroff.png'))
+        self.__power_off_button = self.__make_button(power_off, "Power Off", power_off_image_path)
+        self.__buttons.append(self.__power_off_button)
+
+        self.__lay_out()
+        self.__show_page(0)
+
+    def destroy(self) -> None:
+        self.__worker.stop()
+        self.__images.stop()
+        super().destroy()
 
-        column = 0
-        row = 0
+    @property
+    def __page_count(self) -> int:
+        """Gets the number of pages of devices."""
+        return max(int((len(devices) + self.__page_size - 1) / self.__page_size), 1)
 
-        def selector(target: Device):
-            target.select()
+    def __lay_out(self) -> None:
+        """Creates the buttons for one page of devices, unless the current buttons already fit the devices."""
+        if len(devices) < self.__cells:
+            page_size = max(len(devices), 1)
+            paged = False
+        else:
+            # Only one page of buttons is created, and reused for each page, along with previous and next buttons.
+            page_size = max(self.__cells - 3, 1)
+            paged = True
 
-        for device in devices:
-            # Create the command callback partial.
-            command = functools.partial(selector, device)  # type: Callable[[], None]
+        slot_count = min(page_size, len(devices))
+        if (page_size == self.__page_size and slot_count == len(self.__slots) and
+                paged == (self.__previous_button is not None)):
+            return
 
-            button = self.__make_button(command, device)
-            button.grid(column=column, row=row, sticky=(tk.N, tk.W))
-            button.grid_configure(padx=1, pady=1)
+        for button in self.__slots + [self.__previous_button, self.__next_button]:
+            if button is not None:
+                self.__remove_button(button)
 
+        self.__page_size = page_size
+        self.__slots = []
+        self.__previous_button = None
+        self.__next_button = None
+        for cell in range(slot_count):
+            button = tk.Button(self.__frame, **Main.__button_config())
+            self.__place(button, cell)
+            self.__slots.append(button)
             self.__buttons.append(button)
 
-            # Move the column and row positions as necessary.
-            column = column + 1
-            if column == columns:
-                row = row + 1
-                column = 0
+        cell = len(self.__slots)
+        if paged:
+            self.__previous_button = tk.Button(self.__frame, text="\u25C0", **Main.__button_config())
+            self.__previous_button.config(command=lambda: self.__show_page(self.__page - 1))
+            self.__next_button = tk.Button(self.__frame, text="\u25B6", **Main.__button_config())
+            self.__next_button.config(command=lambda: self.__show_page(self.__page + 1))
+            self.__place(self.__previous_button, cell)
+            self.__place(self.__next_button, cell + 1)
+            self.__buttons.extend([self.__previous_button, self.__next_button])
+            cell = cell + 2
 
-        def power_off():
-            for name, switch in switches.items():
-                switch.power_off()
-            State.current.shutting_down = True
-            self.destroy()
+        self.__place(self.__power_off_button, cell)
 
-        # noinspection SpellCheckingInspection
-        power_off_image_path = os.path.abspath(os.path.join(os.path.dirname(__file__), './res/poweroff.png'))
-        button = self.__make_button(power_off, Image.open(power_off_image_path))
-        button.grid(column=column, row=row, sticky=(tk.N, tk.W))
+    def __place(self, button: tk.Button, cell: int) -> None:
+        """
+        Places a button in the grid.
+        :param button: The button.
+        :param cell:   The index of the cell, counting across then down.
+        """
+        button.grid(column=cell % self.__columns, row=int(cell / self.__columns), sticky=(tk.N, tk.W))
         button.grid_configure(padx=1, pady=1)
-        self.__buttons.append(button)
 
-        def power_on():
-            for name, switch in switches.items():
-                switch.power_on()
+    def __remove_button(self, button: tk.Button) -> None:
+        """
+        Removes a button from the grid, and forgets it.
+        :param button: The button.
+        """
+        if self.__selected is button:
+            self.__selected = None
+
+        self.__normal_images.pop(button, None)
+        self.__selected_images.pop(button, None)
+        self.__slot_devices.pop(button, None)
+        self.__buttons.remove(button)
+        button.destroy()
+
+    def __check_config(self) -> None:
+        """Reloads the configuration if it has changed, updating only the buttons of the devices that changed."""
+        if not snapshot.changed():
+            return
 
-        self.after_idle(power_on)
+        try:
+            if not snapshot.reload():
+                return
+        except Exception as e:
+            log.error("Failed to reload the configuration, keeping the current configuration: {0}".format(e))
+            return
+
+        log.info("Reloaded the configuration")
+        if self.__selected_device not in devices:
+            self.__selected_device = None
+
+        self.__lay_out()
+        self.__show_page(self.__page)
 
     def __activate_button(self, command: Callable[[], None], button: tk.Button):
-        selected = self.__selected
+        with tracer.span("press", "ui", {"button": button.cget("text")}):
+            selected = self.__selected
+            if selected:
+                selected.config(activebackground=Colors.BUTTON_NORMAL, background=Colors.BUTTON_NORMAL)
+                if selected in self.__normal_images:
+                    selected.config(image=self.__normal_images[selected])
+
+            command()
+            self.__selected = button
+            self.__selected_device = None
+            button.config(activebackground=Colors.BUTTON_SELECTED, background=Colors.BUTTON_SELECTED)
+            if button in self.__selected_images:
+                button.config(image=self.__selected_images[button])
+
+    def __select_device(self, button: tk.Button, device: Device) -> None:
+        """
+        Selects a device from its button.
+        :param button: The button showing the device.
+        :param device: The device.
+        """
+        self.__activate_button(functools.partial(self.__post, device.queue_select,
+                                                 functools.partial(self.__on_selected, device)), button)
+        self.__selected_device = device
+
+    def __show_page(self, page: int) -> None:
+        """
+        Shows a page of devices on the reusable buttons, only the images for that page are kept loaded.
+        :param page: The page to show.
+        """
+        self.__page = min(max(page, 0), self.__page_count - 1)
+        self.__waiting = []
+        first = self.__page * self.__page_size
+        for index, button in enumerate(self.__slots):
+            device = devices[first + index] if first + index < len(devices) else None
+            if self.__slot_devices.get(button) is not device:
+                # Drop the images of the device previously shown.
+                self.__normal_images.pop(button, None)
+                self.__selected_images.pop(button, None)
+                self.__slot_devices.pop(button, None)
+                if self.__selected is button:
+                    self.__selected = None
+
+            if device is None:
+                button.grid_remove()
+                continue
+
+            self.__show_device(button, device)
+            button.grid()
+
+        if self.__previous_button is not None:
+            self.__previous_button.config(state=tk.NORMAL if self.__page > 0 else tk.DISABLED)
+        if self.__next_button is not None:
+            self.__next_button.config(state=tk.NORMAL if self.__page < self.__page_count - 1 else tk.DISABLED)
+
+    def __show_device(self, button: tk.Button, device: Device) -> None:
+        """
+        Shows a device on a button.
+        :param button: The button.
+        :param device: The device.
+        """
+        selected = device is self.__selected_device
+        if self.__slot_devices.get(button) is not device:
+            self.__slot_devices[button] = device
+
+            # The title is shown until the image, if any, is loaded.
+            button.config(image='', text=device.title)
+            if len(device.image) > 0:
+                self.__images.load(device.image, functools.partial(self.__on_image_loaded, button, device))
+        elif button in self.__normal_images:
+            # Still showing the device, so its images are kept.
+            button.config(image=self.__selected_images[button] if selected else self.__normal_images[button])
+
+        color = Colors.BUTTON_SELECTED if selected else Colors.BUTTON_NORMAL
+        button.config(activebackground=color, background=color,
+                      command=functools.partial(self.__select_device, button, device))
         if selected:
-            selected.config(activebackground=Colors.BUTTON_NORMAL, background=Colors.BUTTON_NORMAL)
-            if selected in self.__normal_images:
-                selected.config(image=self.__normal_images[selected])
+            self.__selected = button
+        elif self.__selected is button:
+            self.__selected = None
 
-        command()
-        self.__selected = button
-        button.config(activebackground=Colors.BUTTON_SELECTED, background=Colors.BUTTON_SELECTED)
-        if button in self.__selected_images:
-            button.config(image=self.__selected_images[button])
+        # The switches are started in the background, so the device may not be selectable yet.
+        if device.ready:
+            button.config(state=tk.NORMAL)
+        else:
+            button.config(state=tk.DISABLED)
+            self.__waiting.append((button, device))
 
     def __idle_poll(self) -> None:
-        self.after(500, self.__idle_poll)
-
-    def __make_button(self, command: Callable[[tk.Button], None], target: ButtonTarget) -> tk.Button:
-            # noinspection SpellCheckingInspection
-            button_config = {
-                'borderwidth': 0,
-                'highlightthickness': 0,
-                'activebackground': Colors.BUTTON_NORMAL,
-                'background': Colors.BUTTON_NORMAL
-            }
-
-            if isinstance(target, Device):
-                # Device button
-                device = target
-                if len(device.image) > 0:
-                    # Get the selected image.
-                    selected = ImageTk.PhotoImage(Image.open(device.image))
-                    # Generate the normal image.
-                    enhancer = ImageEnhance.Brightness(Image.open(device.image))
-                    normal = ImageTk.PhotoImage(enhancer.enhance(0.66))
-
-                    button = tk.Button(self.__frame, image=normal, **button_config)
-                    self.__selected_images[button] = selected
-                    self.__normal_images[button] = normal
-                else:
-                    text = device.title
-                    button = tk.Button(self.__frame, text=text, **button_config)
-
-                # Generate a partial to bind the button and command to __activate_button.
-                bound_command = functools.partial(self.__activate_button, command, button)  # type: Callable[[], None]
-                button.config(command=bound_command)
-                return button
-            elif isinstance(target, Image.Image):
-                # Special button
-                # Get the selected image.
-                selected = ImageTk.PhotoImage(target)
-                # Generate the normal image.
-                # noinspection PyTypeChecker
-                enhancer = ImageEnhance.Brightness(Image.fromarray(np.asarray(target)))
-                normal = ImageTk.PhotoImage(enhancer.enhance(0.66))
-
-                button = tk.Button(self.__frame, image=normal, **button_config)
-                self.__selected_images[button] = selected
-                self.__normal_images[button] = normal
-
-                # Generate a partial to bind the button and command to __activate_button.
-                bound_command = functools.partial(self.__activate_button, command, button)  # type: Callable[[], None]
-                button.config(command=bound_command)
-                return button
+        self.__worker.poll()
+        self.__images.poll()
+        if time.monotonic() >= self.__next_config_check:
+            self.__next_config_check = time.monotonic() + Main.CONFIG_CHECK_INTERVAL
+            self.__check_config()
+
+        self.__enable_ready_buttons()
+        busy = self.__worker.busy or self.__images.busy or len(self.__waiting) > 0
+        interval = Main.BUSY_POLL_INTERVAL if busy else Main.IDLE_POLL_INTERVAL
+        self.__poll_id = self.after(interval, self.__idle_poll)
+
+    def __enable_ready_buttons(self) -> None:
+        """Enables the buttons of the devices whose switches have started."""
+        waiting = []  # type: List[Tuple[tk.Button, Device]]
+        for button, device in self.__waiting:
+            if device.ready:
+                button.config(state=tk.NORMAL)
+            else:
+                waiting.append((button, device))
+
+        self.__waiting = waiting
+
+    def __post(self, command: Callable[[], Any], callback: Callable[[Any, Union[None, Exception]], None] = None):
+        """
+        Runs a command on the command worker, keeping the user interface responsive.
+        :param command:  The command to run.
+        :param callback: Called on the user interface thread once the command completes.
+        """
+        self.__worker.post(command, callback)
+
+        # Poll for the completion sooner than when idle.
+        self.after_cancel(self.__poll_id)
+        self.__poll_id = self.after(Main.BUSY_POLL_INTERVAL, self.__idle_poll)
+
+    # noinspection PyUnusedLocal
+    @staticmethod
+    def __on_selected(device: Device, result: Any, error: Union[None, Exception]) -> None:
+        if error is not None:
+            log.error("Failed to select `{0}`".format(device.title))
+
+    @staticmethod
+    def __button_config() -> Dict[str, Any]:
+        """
+        Gets the common configuration of the buttons.
+        :return: The button configuration.
+        """
+        # noinspection SpellCheckingInspection
+        return {
+            'borderwidth': 0,
+            'highlightthickness': 0,
+            'activebackground': Colors.BUTTON_NORMAL,
+            'background': Colors.BUTTON_NORMAL
+        }
+
+    def __on_image_loaded(self, button: tk.Button, device: Union[None, Device], paths: Union[None, Tuple[str, str]],
+                          error: Union[None, Exception]) -> None:
+        """
+        Shows the images of a button once they are loaded.
+        :param button: The button.
+        :param device: The device shown on the button when the images were requested, or None for a special button.
+        :param paths:  The paths to the normal and selected images.
+        :param error:  The error raised loading the images, the placeholder text stays if there is one.
+        """
+        # The button may show another device by now, special buttons are never in the slots so always match.
+        if error is not None or self.__slot_devices.get(button) is not device:
+            return
+
+        # The images are rendered to size and cached, so Tk can simply load them.
+        normal_path, selected_path = paths
+        self.__selected_images[button] = tk.PhotoImage(file=selected_path)
+        self.__normal_images[button] = tk.PhotoImage(file=normal_path)
+        selected = button is self.__selected
+        button.config(image=self.__selected_images[button] if selected else self.__normal_images[button])
+
+    def __make_button(self, command: Callable[[], None], title: str, image_path: str) -> tk.Button:
+        """
+        Creates a special button showing an image, dimmed unless selected.
+        :param command:    The command of the button.
+        :param title:      The text shown until the image is loaded.
+        :param image_path: The path to the image.
+        :return: The button.
+        """
+        button = tk.Button(self.__frame, text=title, **Main.__button_config())
+        self.__images.load(image_path, functools.partial(self.__on_image_loaded, button, None))
+
+        # Generate a partial to bind the button and command to __activate_button.
+        bound_command = functools.partial(self.__activate_button, command, button)  # type: Callable[[], None]
+        button.config(command=bound_command)
+        return button
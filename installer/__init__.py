@@ -1,60 +1,120 @@
-from typing import List
+from typing import List, Set, Union
+import os
 import logging
 
-import dbus
-import dbus.service
-
 from state import State
 
 log = logging.getLogger(__name__)
 
+# The dpkg database of installed packages.
+_DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+
+# The required dependencies.
+# noinspection SpellCheckingInspection
+_DEPENDENCIES = [
+    "python3-serial",
+    "python3-xdg",
+    "python3-tk",
+    "python3-pil",
+    "python3-pil.imagetk",
+]
+
+
+def _get_fingerprint() -> str:
+    """
+    Gets a fingerprint of the installed package set and the dependencies, which changes whenever packages are installed
+    or removed, or the dependencies change.
+    :return: The fingerprint, or an empty string if the package set cannot be found.
+    """
+    try:
+        status = os.stat(_DPKG_STATUS_PATH)
+    except OSError:
+        return ""
+
+    return "{0}:{1}:{2}".format(status.st_size, status.st_mtime_ns, ",".join(_DEPENDENCIES))
+
+
+def _get_installed_packages() -> Union[None, Set[str]]:
+    """
+    Gets the names of all installed packages in one pass over the dpkg database.
+    :return: The installed package names, or None if the database could not be read.
+    """
+    installed = set()  # type: Set[str]
+    try:
+        with open(_DPKG_STATUS_PATH, encoding="utf-8", errors="replace") as status:
+            package = None  # type: Union[None, str]
+            for line in status:
+                if line.startswith("Package:"):
+                    package = line[8:].strip()
+                elif line.startswith("Status:") and package is not None:
+                    if line.split()[-1] == "installed":
+                        installed.add(package)
+                elif len(line.strip()) == 0:
+                    package = None
+    except OSError:
+        return None
+
+    return installed
+
 
 class _Installer:
     """Provides the necessary processes for handling the dependencies for the A/V switch controller"""
 
-    # noinspection SpellCheckingInspection
     def __init__(self):
         """Initializes a new _Installer class."""
         # The required dependencies.
-        self.__dependencies = [
-            "python3-numpy",
-            "python3-serial",
-            "python3-xdg",
-            "python3-tk",
-            "python3-pil",
-            "python3-pil.imagetk",
-        ]
+        self.__dependencies = _DEPENDENCIES
 
         # The missing dependencies to install.
         self.__missing = []  # type: List[str]
 
-        # Connect to the PackageKit session interface.
-        bus = dbus.SessionBus()
-        self.__name = dbus.service.BusName("org.sleepingscats.PiAvSwitchController", bus)
-        kit = bus.get_object("org.freedesktop.PackageKit", "/org/freedesktop/PackageKit")
-
-        # Get the package installation query method.
-        query = dbus.Interface(kit, "org.freedesktop.PackageKit.Query")
-        self.__is_installed_method = query.get_dbus_method("IsInstalled")
-
-        # Get the package install method.
-        modify = dbus.Interface(kit, "org.freedesktop.PackageKit.Modify")
-        self.__install_method = modify.get_dbus_method("InstallPackageNames")
+        # The PackageKit methods, only connected if needed.
+        self.__name = None
+        self.__is_installed_method = None
+        self.__install_method = None
 
     def check(self) -> bool:
         """Determines whether any dependencies are missing."""
         log.info("Checking for missing dependencies...")
-        for dependency in self.__dependencies:
-            if not bool(self.__is_installed_method(dependency, "")):
-                self.__missing.append(dependency)
+        installed = _get_installed_packages()
+        if installed is not None:
+            self.__missing = [dependency for dependency in self.__dependencies if dependency not in installed]
+        else:
+            # No dpkg database, so ask PackageKit about each dependency.
+            self.__connect()
+            for dependency in self.__dependencies:
+                if not bool(self.__is_installed_method(dependency, "")):
+                    self.__missing.append(dependency)
 
         return len(self.__missing) > 0
 
     def install(self) -> None:
         """Installs any missing dependencies."""
         log.info("Installing the following dependencies: {}".format(", ".join(self.__missing)))
+        self.__connect()
         self.__install_method(0, self.__missing, "show-confirm-search,hide-finished", timeout=3600)
 
+    def __connect(self) -> None:
+        """Connects to the PackageKit session interface, if not already connected."""
+        if self.__install_method is not None:
+            return
+
+        # Only imported when PackageKit is needed, which is never on a normal start.
+        import dbus
+        import dbus.service
+
+        bus = dbus.SessionBus()
+        self.__name = dbus.service.BusName("org.sleepingscats.PiAvSwitchController", bus)
+        kit = bus.get_object("org.freedesktop.PackageKit", "/org/freedesktop/PackageKit")
+
+        # Get the package installation query method.
+        query = dbus.Interface(kit, "org.freedesktop.PackageKit.Query")
+        self.__is_installed_method = query.get_dbus_method("IsInstalled")
+
+        # Get the package install method.
+        modify = dbus.Interface(kit, "org.freedesktop.PackageKit.Modify")
+        self.__install_method = modify.get_dbus_method("InstallPackageNames")
+
 
 def install() -> None:
     """Checks for and installs any missing dependencies."""
@@ -62,8 +122,17 @@ def install() -> None:
         # No need to perform any setup.
         return
 
+    # Nothing was installed or removed since the dependencies were last found.
+    fingerprint = _get_fingerprint()
+    if len(fingerprint) > 0 and fingerprint == State.current.dependency_fingerprint:
+        log.info("Installed packages unchanged, skipping the dependency check")
+        return
+
     log.info("Performing first time or update installation...")
 
     installer = _Installer()
     if installer.check():
         installer.install()
+        fingerprint = _get_fingerprint()
+
+    State.current.dependency_fingerprint = fingerprint
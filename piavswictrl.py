@@ -1,8 +1,13 @@
 #!/usr/bin/python3
+import os
 import sys
 import logging
 
-import dbus
+import startup
+
+# Profile start-up if asked, this must be enabled before anything else is imported to time all the imports.
+if "--profile-startup" in sys.argv or bool(os.getenv("PIAVSWICTRL_PROFILE_STARTUP")):
+    startup.profile.enable()
 
 from state import State
 
@@ -25,7 +30,8 @@ def _do_setup() -> None:
 
 def _run_app() -> None:
     """Runs the application."""
-    import app
+    with startup.profile.phase("import app"):
+        import app
 
     app.main()
 
@@ -40,25 +46,26 @@ def _may_shut_down() -> None:
 
 def _main() -> int:
     """The main entry point for the application."""
-    with State():
+    with startup.profile.phase("load state"):
+        state = State()
+
+    with state:
         logging.info("Starting A/V Switch Controller {}".format(__version__))
         logging.info("Last version `{0}` using configuration from `{1}`".format(
             State.current.last_setup_version, State.current.config_file_path))
 
         # Perform any installation tasks that might be required.
         try:
-            _do_install()
-        except dbus.exceptions.DBusException as e:
-            logging.error("Failed to install dependencies")
-            logging.exception(e)
-            return 1
+            with startup.profile.phase("install"):
+                _do_install()
         except Exception as e:
             logging.error("Failed to install dependencies")
             logging.exception(e)
             return 1
 
         try:
-            _do_setup()
+            with startup.profile.phase("setup"):
+                _do_setup()
         except Exception as e:
             logging.exception(e)
             return 1
@@ -1,9 +1,6 @@
 import os
 import logging
 
-import xdg.BaseDirectory
-from xdg.DesktopEntry import DesktopEntry
-
 import tkinter as tk
 from tkinter import messagebox
 
@@ -18,6 +15,9 @@ class _Setup:
     # noinspection SpellCheckingInspection
     def __init__(self):
         """Initializes a new instance of the _Setup class."""
+        # Only needed on fresh installs or upgrades.
+        import xdg.BaseDirectory
+
         self.__user_auto_start_directory = os.path.join(xdg.BaseDirectory.xdg_config_home, "autostart")
         self.__auto_start_entry = os.path.join(self.__user_auto_start_directory,
                                                "{}.desktop".format(State.current.my_name))
@@ -35,6 +35,8 @@ class _Setup:
 
     def add_startup(self) -> None:
         """Creates the auto-start entry if the user wants one."""
+        from xdg.DesktopEntry import DesktopEntry
+
         entry = DesktopEntry()
         entry.addGroup(DesktopEntry.defaultGroup)
         entry.set("Type", "Application")
@@ -0,0 +1,186 @@
+from typing import Callable, List, Union
+import os
+import tty
+import time
+import socket
+import threading
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class LinkTiming:
+    """The timing of a simulated link, so the drivers see roughly the delays of the real hardware."""
+
+    BITS_PER_BYTE = 10  # A start bit, eight data bits, and a stop bit.
+
+    def __init__(self, baud: int = 0, response_delay: float = 0.0):
+        """
+        Initializes a new instance of the LinkTiming class.
+        :param baud:           The line speed, each byte received or sent takes the time to send it at this speed, or
+                               no time if zero.
+        :param response_delay: The number of seconds the device takes to act on a command before it replies.
+        """
+        self.baud = baud
+        self.response_delay = response_delay
+
+    def transfer_time(self, size: int) -> float:
+        """
+        Gets the time to send bytes over the line.
+        :param size: The number of bytes.
+        :return: The number of seconds.
+        """
+        return size * LinkTiming.BITS_PER_BYTE / self.baud if self.baud > 0 else 0.0
+
+
+class Engine:
+    """The protocol of a simulated device, which turns the bytes it receives into replies."""
+
+    def greeting(self) -> bytes:
+        """
+        Gets the bytes the device sends on its own when a connection is opened.
+        :return: The greeting.
+        """
+        return b""
+
+    def receive(self, data: bytes) -> bytes:
+        """
+        Handles received bytes.
+        :param data: The bytes received, which may hold partial or several commands.
+        :return: The replies to any commands now complete.
+        """
+        return b""
+
+
+class _Link:
+    """Carries the bytes of one connection between the driver and an engine, with the timing of the line."""
+
+    def __init__(self, name: str, engine: Engine, timing: LinkTiming, read: Callable[[], bytes],
+                 write: Callable[[bytes], None]):
+        """
+        Initializes a new instance of the _Link class, and starts serving the connection.
+        :param name:   The name of the link, for logging.
+        :param engine: The engine of the device.
+        :param timing: The timing of the line.
+        :param read:   Reads the next bytes from the driver, returning nothing once the connection is closed.
+        :param write:  Writes bytes to the driver.
+        """
+        self.name = name
+        self.__engine = engine
+        self.__timing = timing
+        self.__read = read
+        self.__write = write
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="simulator-{0}".format(name))
+        self.__thread.start()
+
+    def __send(self, data: bytes) -> None:
+        """
+        Sends bytes to the driver at the speed of the line.
+        :param data: The bytes to send.
+        """
+        if len(data) > 0:
+            time.sleep(self.__timing.transfer_time(len(data)))
+            self.__write(data)
+
+    def __run(self) -> None:
+        """Serves the connection until it is closed."""
+        try:
+            self.__send(self.__engine.greeting())
+            while True:
+                data = self.__read()
+                if len(data) == 0:
+                    return
+
+                # The bytes only arrive as fast as the line carries them, and the device takes time to act on them.
+                time.sleep(self.__timing.transfer_time(len(data)))
+                replies = self.__engine.receive(data)
+                if len(replies) > 0:
+                    time.sleep(self.__timing.response_delay)
+                    self.__send(replies)
+        except OSError as e:
+            log.debug("Simulated link `{0}` closed: {1}".format(self.name, e))
+
+
+class TcpSimulator:
+    """Serves a simulated device over TCP, each connection gets its own engine as a real device would."""
+
+    def __init__(self, engine_factory: Callable[[], Engine], port: int = 0, timing: LinkTiming = None,
+                 host: str = "127.0.0.1"):
+        """
+        Initializes a new instance of the TcpSimulator class, and starts listening.
+        :param engine_factory: Creates the engine for each connection.
+        :param port:           The port to listen on, or zero to use any free port.
+        :param timing:         The timing of the line.
+        :param host:           The address to listen on.
+        """
+        self.__engine_factory = engine_factory
+        self.__timing = timing or LinkTiming()
+        self.__listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__listener.bind((host, port))
+        self.__listener.listen(5)
+        self.host = host
+        self.port = self.__listener.getsockname()[1]
+        self.engines = []  # type: List[Engine]
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="simulator-tcp-{0}".format(self.port))
+        self.__thread.start()
+
+    def close(self) -> None:
+        """Stops listening, connections already open are left to close on their own."""
+        self.__listener.close()
+
+    def __run(self) -> None:
+        """Accepts connections until closed."""
+        while True:
+            try:
+                connection, address = self.__listener.accept()
+            except OSError:
+                return
+
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            engine = self.__engine_factory()
+            self.engines.append(engine)
+            _Link("{0}:{1}".format(*address), engine, self.__timing, lambda: connection.recv(4096), connection.sendall)
+
+
+class PtySimulator:
+    """Serves a simulated device over a pseudo-terminal, which the drivers open as they would a serial port."""
+
+    def __init__(self, engine: Engine, timing: LinkTiming = None):
+        """
+        Initializes a new instance of the PtySimulator class.
+        :param engine: The engine of the device.
+        :param timing: The timing of the line.
+        """
+        self.engine = engine
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        self.path = os.ttyname(self.__slave)
+        self.__link = _Link(self.path, engine, timing or LinkTiming(), self.__read, self.__write)
+
+    @property
+    def tty(self) -> str:
+        """Gets the name of the terminal relative to `/dev`, as given in the configuration."""
+        return os.path.relpath(self.path, os.path.join(os.path.sep, "dev"))
+
+    def close(self) -> None:
+        """Closes the terminal."""
+        os.close(self.__slave)
+        os.close(self.__master)
+
+    def __read(self) -> bytes:
+        """
+        Reads the bytes written by the driver.
+        :return: The bytes, or nothing once the terminal is closed.
+        """
+        try:
+            return os.read(self.__master, 4096)
+        except OSError:
+            return b""
+
+    def __write(self, data: Union[bytes, bytearray]) -> None:
+        """
+        Writes bytes for the driver to read.
+        :param data: The bytes.
+        """
+        os.write(self.__master, data)
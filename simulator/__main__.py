@@ -0,0 +1,54 @@
+import sys
+import time
+import argparse
+import logging
+
+from . import LinkTiming, TcpSimulator, PtySimulator
+
+
+def main() -> int:
+    """
+    Runs a simulated switch until interrupted, so the application can be pointed at it.
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m simulator", description="Runs a simulated switch.")
+    parser.add_argument("device", choices=("extron", "tesla-smart", "sony-bvm-d"), help="the switch to simulate")
+    parser.add_argument("--port", type=int, default=None,
+                        help="the TCP port to listen on, 23 for Extron and 5000 for Tesla-Smart by default")
+    parser.add_argument("--baud", type=int, default=0, help="the line speed, zero for none")
+    parser.add_argument("--response-delay", type=float, default=0.0, help="the seconds taken to act on a command")
+    parser.add_argument("--inputs", type=int, default=12, help="the number of inputs")
+    parser.add_argument("--outputs", type=int, default=8, help="the number of outputs")
+    arguments = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    timing = LinkTiming(arguments.baud, arguments.response_delay)
+    if arguments.device == "extron":
+        from .extron import ExtronEngine
+
+        simulator = TcpSimulator(lambda: ExtronEngine(arguments.inputs, arguments.outputs),
+                                 23 if arguments.port is None else arguments.port, timing)
+        print("Extron SIS listening on {0}:{1}".format(simulator.host, simulator.port))
+    elif arguments.device == "tesla-smart":
+        from .tesla import TeslaEngine
+
+        engine = TeslaEngine(arguments.inputs)
+        simulator = TcpSimulator(lambda: engine, 5000 if arguments.port is None else arguments.port, timing)
+        print("Tesla-Smart listening on {0}:{1}".format(simulator.host, simulator.port))
+    else:
+        from .sony import SonyEngine
+
+        simulator = PtySimulator(SonyEngine(), timing)
+        print("Sony BVM bus on `{0}`, configure `tty` as `{1}`".format(simulator.path, simulator.tty))
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+from typing import Any, Dict, List
+import sys
+import json
+import time
+import argparse
+import logging
+
+from . import LinkTiming, TcpSimulator, PtySimulator
+from .extron import ExtronEngine
+from .tesla import TeslaEngine
+from .sony import SonyEngine
+
+# The speeds of the real hardware.
+_EXTRON_BAUD = 9600
+_TESLA_BAUD = 9600
+_SONY_BAUD = 38400
+
+
+def _percentile(samples: List[float], fraction: float) -> float:
+    """
+    Gets a percentile of the samples, by the nearest rank.
+    :param samples:  The sorted samples.
+    :param fraction: The percentile, as a fraction.
+    :return: The sample at the percentile.
+    """
+    return samples[min(int(round(fraction * (len(samples) - 1))), len(samples) - 1)]
+
+
+def _parse_arguments() -> argparse.Namespace:
+    """
+    Parses the command line.
+    :return: The arguments.
+    """
+    parser = argparse.ArgumentParser(prog="python3 -m simulator.benchmark",
+                                     description="Measures device selection against simulated switches.")
+    parser.add_argument("--selections", type=int, default=200, help="the number of selections to time")
+    parser.add_argument("--devices", type=int, default=8, help="the number of devices to select between")
+    parser.add_argument("--baud", type=int, default=None,
+                        help="the line speed of every simulated switch, zero for none; the real speeds by default")
+    parser.add_argument("--response-delay", type=float, default=0.005,
+                        help="the seconds the Extron takes to act on a command")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="use the asynchronous drivers")
+    parser.add_argument("--json", action="store_true", help="report in JSON, such as for CI")
+    return parser.parse_args()
+
+
+def main() -> int:
+    """
+    Runs the benchmark.
+    :return: The exit code.
+    """
+    arguments = _parse_arguments()
+    logging.basicConfig(level=logging.WARNING)
+
+    # Only imported once the arguments are valid, since the application is heavy to import.
+    from app.support.Switch import switches, load_switches, start_switches
+    from app.support.Device import devices, load_devices
+    from app.support.drivers.libraries.sony_bvm_rs485.protocol import Address, AddressKind
+
+    def baud(default: int) -> int:
+        return default if arguments.baud is None else arguments.baud
+
+    extron = TcpSimulator(lambda: ExtronEngine(12, 8),
+                          timing=LinkTiming(baud(_EXTRON_BAUD), arguments.response_delay))
+    # The Tesla-Smart driver connects for each command, so every connection shares the one switch.
+    tesla_engine = TeslaEngine(16)
+    tesla = TcpSimulator(lambda: tesla_engine, timing=LinkTiming(baud(_TESLA_BAUD)))
+    sony = PtySimulator(SonyEngine(), LinkTiming(baud(_SONY_BAUD)))
+
+    switch_config = {
+        "extron": {"driver": "extron", "async": arguments.use_async,
+                   "config": {"maxInputs": 12, "maxOutputs": 8, "host": extron.host, "port": extron.port}},
+        "tesla": {"driver": "tesla-smart", "async": arguments.use_async,
+                  "config": {"maxInputs": 16, "host": tesla.host, "port": tesla.port}},
+        "bvm": {"driver": "sony-bvm-d", "async": arguments.use_async,
+                "config": {"tty": sony.tty}},
+    }  # type: Dict[str, Dict[str, Any]]
+
+    # Each device is on a different input, so every selection has to change the ties.
+    device_config = [{
+        "title": "Device {0}".format(index + 1),
+        "ties": {
+            "extron": {"input": index % 12 + 1, "output": {"video": 1, "audio": 1}},
+            "tesla": {"input": index % 16 + 1},
+            "bvm": {"input": index % 99 + 1},
+        },
+    } for index in range(max(arguments.devices, 2))]
+
+    load_switches(switch_config)
+    load_devices(device_config)
+    start_switches()
+    while not all(device.ready for device in devices):
+        time.sleep(0.01)
+
+    # Warm up, making the connections before anything is timed.
+    devices[-1].select()
+
+    latencies = []  # type: List[float]
+    started = time.perf_counter()
+    for selection in range(arguments.selections):
+        device = devices[selection % len(devices)]
+        selected = time.perf_counter()
+        device.select()
+        latencies.append(time.perf_counter() - selected)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    report = {
+        "selections": len(latencies),
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "selections_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+    }
+
+    if arguments.json:
+        print(json.dumps(report))
+    else:
+        print("Selections:      {0}".format(report["selections"]))
+        print("p50 latency:     {0:.2f} ms".format(report["p50_ms"]))
+        print("p99 latency:     {0:.2f} ms".format(report["p99_ms"]))
+        print("Max latency:     {0:.2f} ms".format(report["max_ms"]))
+        print("Selections/sec:  {0:.1f}".format(report["selections_per_second"]))
+
+    # Make sure the simulated switches ended up where the last selection put them, the monitors never reply, so the
+    # last of their commands may still be on its way.
+    last = devices[(arguments.selections - 1) % len(devices)] if arguments.selections > 0 else devices[-1]
+    expected = {tie.switch.id: tie.input for tie in last.ties}
+    deadline = time.monotonic() + 1.0
+    while True:
+        actual = {
+            "extron": extron.engines[-1].video.get(1),
+            "tesla": tesla_engine.input,
+            "bvm": sony.engine.channels.get(Address(AddressKind.ALL, 0).package()),
+        }
+        if actual == expected or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+
+    if actual != expected:
+        print("Simulated switches do not match the last selection: {0} != {1}".format(actual, expected),
+              file=sys.stderr)
+        return 1
+
+    for switch in switches.values():
+        switch.close().result()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
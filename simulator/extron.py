@@ -0,0 +1,136 @@
+from typing import Dict, List, Union
+import re
+import threading
+
+from . import Engine
+
+# The commands understood, a tie of video (%), audio ($), or both (! or &), a quick multiple tie of any number of ties,
+# and the firmware version query.
+_TIE = re.compile(rb'(\d+)\*(\d+)([%$!&])')
+_QUICK_TIE = re.compile(rb'\x1B\+Q((?:\d+\*\d+[%$!&])*)\r')
+_QUERY = b"Q"
+
+# The signals named in the tie replies.
+_SIGNALS = {b"%": "Vid", b"$": "Aud", b"!": "All", b"&": "RGB"}
+
+
+class ExtronEngine(Engine):
+    """Simulates the SIS protocol of an Extron matrix switch."""
+
+    BANNER = b"\r\n(c) Copyright 2021, Extron Electronics, CrossPoint Plus 128 HVA, V1.23, 60-336-21\r\n"
+    DATE = b"Fri, 01 Jan 2021 00:00:00\r\n"
+    VERSION = b"1.23\r\n"
+
+    def __init__(self, max_inputs: int = 12, max_outputs: int = 8):
+        """
+        Initializes a new instance of the ExtronEngine class.
+        :param max_inputs:  The number of inputs of the switch.
+        :param max_outputs: The number of outputs of the switch.
+        """
+        self.max_inputs = max_inputs
+        self.max_outputs = max_outputs
+        self.video = {}  # type: Dict[int, int]
+        self.audio = {}  # type: Dict[int, int]
+        self.commands = 0
+        self.__lock = threading.Lock()
+        self.__buffer = bytearray()
+
+    def greeting(self) -> bytes:
+        """
+        Gets the log-in message, the copyright banner followed by the date and time.
+        :return: The log-in message.
+        """
+        return ExtronEngine.BANNER + ExtronEngine.DATE
+
+    def receive(self, data: bytes) -> bytes:
+        """
+        Handles received bytes.
+        :param data: The bytes received.
+        :return: The replies to the commands now complete.
+        """
+        with self.__lock:
+            self.__buffer.extend(data)
+            replies = []  # type: List[bytes]
+            while True:
+                # Line breaks between commands are ignored.
+                while len(self.__buffer) > 0 and self.__buffer[0] in b"\r\n ":
+                    del self.__buffer[0]
+
+                if len(self.__buffer) == 0:
+                    break
+
+                buffer = bytes(self.__buffer)
+                match = _TIE.match(buffer) or _QUICK_TIE.match(buffer)
+                if match is not None:
+                    del self.__buffer[:match.end()]
+                    replies.append(self.__tie(match) if match.re is _TIE else self.__quick_tie(match.group(1)))
+                elif buffer.startswith(_QUERY):
+                    del self.__buffer[:len(_QUERY)]
+                    replies.append(ExtronEngine.VERSION)
+                elif re.match(rb'^(\d+\*?\d*|\x1B(\+(Q[\d*%$!&]*)?)?)$', buffer):
+                    # Wait on the rest of the command.
+                    break
+                else:
+                    del self.__buffer[0]
+                    replies.append(b"E10\r\n")
+
+                self.commands = self.commands + 1
+
+            return b"".join(replies)
+
+    def __tie(self, match) -> bytes:
+        """
+        Makes a tie.
+        :param match: The match of the tie command.
+        :return: The reply.
+        """
+        input_channel, output_channel, kind = int(match.group(1)), int(match.group(2)), match.group(3)
+        error = self.__validate(input_channel, output_channel)
+        if error is not None:
+            return error
+
+        self.__apply(input_channel, output_channel, kind)
+        return "Out{0} In{1} {2}\r\n".format(output_channel, input_channel, _SIGNALS[kind]).encode()
+
+    def __quick_tie(self, ties: bytes) -> bytes:
+        """
+        Makes a quick multiple tie, either all the ties are made or none of them.
+        :param ties: The ties of the command.
+        :return: The reply.
+        """
+        matches = list(_TIE.finditer(ties))
+        for match in matches:
+            error = self.__validate(int(match.group(1)), int(match.group(2)))
+            if error is not None:
+                return error
+
+        for match in matches:
+            self.__apply(int(match.group(1)), int(match.group(2)), match.group(3))
+
+        return b"Qik\r\n"
+
+    def __validate(self, input_channel: int, output_channel: int) -> Union[None, bytes]:
+        """
+        Validates the channels of a tie.
+        :param input_channel:  The input channel.
+        :param output_channel: The output channel.
+        :return: The error reply, or None if the channels are valid.
+        """
+        if not 0 <= input_channel <= self.max_inputs:
+            return b"E01\r\n"
+        if not 1 <= output_channel <= self.max_outputs:
+            return b"E12\r\n"
+
+        return None
+
+    def __apply(self, input_channel: int, output_channel: int, kind: bytes) -> None:
+        """
+        Applies a tie.
+        :param input_channel:  The input channel.
+        :param output_channel: The output channel.
+        :param kind:           The kind of tie.
+        """
+        if kind != b"$":
+            self.video[output_channel] = input_channel
+        if kind in b"$!":
+            self.audio[output_channel] = input_channel
@@ -0,0 +1,45 @@
+from typing import Dict
+import threading
+
+from app.support.drivers.libraries.sony_bvm_rs485.decoder import PacketDecoder
+from app.support.drivers.libraries.sony_bvm_rs485.protocol import Command, CommandBlock
+
+from . import Engine
+
+
+class SonyEngine(Engine):
+    """Simulates the monitors on a Sony BVM RS-485 bus, which act on the commands addressed to them without replying."""
+
+    def __init__(self):
+        """Initializes a new instance of the SonyEngine class."""
+        self.decoder = PacketDecoder()
+        self.channels = {}  # type: Dict[int, int]
+        self.powered = False
+        self.commands = 0
+        self.__lock = threading.Lock()
+
+    def receive(self, data: bytes) -> bytes:
+        """
+        Handles received bytes, the monitors never reply.
+        :param data: The bytes received.
+        :return: Nothing.
+        """
+        with self.__lock:
+            for block in self.decoder.feed(data):
+                self.__handle(block)
+                self.commands = self.commands + 1
+
+        return b""
+
+    def __handle(self, block: CommandBlock) -> None:
+        """
+        Acts on a command.
+        :param block: The command block.
+        """
+        if block.command == Command.SET_CHANNEL:
+            # The channel is remembered by the raw address, all the monitors as one, a group, or a single monitor.
+            self.channels[block.destination.package()] = block.arg1
+        elif block.command == Command.POWER_ON:
+            self.powered = True
+        elif block.command == Command.POWER_OFF:
+            self.powered = False
@@ -0,0 +1,55 @@
+from typing import Union
+import threading
+
+from . import Engine
+
+# A command frame, the header, the length and command, the input channel, and the end marker.
+_HEADER = b"\xAA\xBB\x03\x01"
+_END = 0xEE
+_FRAME_SIZE = 6
+
+
+class TeslaEngine(Engine):
+    """Simulates a Tesla-Smart switch, which takes `AA BB 03 01 nn EE` frames to select input `nn`."""
+
+    def __init__(self, max_inputs: int = 16):
+        """
+        Initializes a new instance of the TeslaEngine class.
+        :param max_inputs: The number of inputs of the switch.
+        """
+        self.max_inputs = max_inputs
+        self.input = None  # type: Union[None, int]
+        self.commands = 0
+        self.errors = 0
+        self.__lock = threading.Lock()
+        self.__buffer = bytearray()
+
+    def receive(self, data: bytes) -> bytes:
+        """
+        Handles received bytes, the switch never replies.
+        :param data: The bytes received.
+        :return: Nothing.
+        """
+        with self.__lock:
+            self.__buffer.extend(data)
+            while len(self.__buffer) > 0:
+                start = self.__buffer.find(_HEADER)
+                if start < 0:
+                    # Keep what may be the start of the next header.
+                    del self.__buffer[:max(len(self.__buffer) - len(_HEADER) + 1, 0)]
+                    break
+
+                del self.__buffer[:start]
+                if len(self.__buffer) < _FRAME_SIZE:
+                    break
+
+                input_channel, end = self.__buffer[4], self.__buffer[5]
+                del self.__buffer[:_FRAME_SIZE]
+                if end != _END or not 1 <= input_channel <= self.max_inputs:
+                    self.errors = self.errors + 1
+                    continue
+
+                self.input = input_channel
+                self.commands = self.commands + 1
+
+        return b""
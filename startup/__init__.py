@@ -0,0 +1,86 @@
+from typing import Dict, List, Tuple
+import sys
+import time
+import builtins
+import threading
+import contextlib
+import logging
+
+log = logging.getLogger(__name__)
+
+
+class _StartupProfile:
+    """Measures how long each phase of start-up takes, and if enabled, each module first imported."""
+
+    def __init__(self):
+        """Initializes a new instance of the _StartupProfile class, time is measured from here."""
+        self.enabled = False
+        self.__started = time.perf_counter()
+        self.__phases = []  # type: List[Tuple[str, float, float]]
+        self.__imports = {}  # type: Dict[str, float]
+        self.__import = builtins.__import__
+        self.__nested = threading.local()
+
+    def enable(self) -> None:
+        """Enables the profile, timing every import made from now on until the report."""
+        if self.enabled:
+            return
+
+        self.enabled = True
+        builtins.__import__ = self.__timed_import
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Times a phase of start-up.
+        :param name: The name of the phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__phases.append((name, started - self.__started, time.perf_counter() - started))
+
+    def mark(self, name: str) -> None:
+        """
+        Marks a moment during start-up, such as the first frame being shown.
+        :param name: The name of the moment.
+        """
+        self.__phases.append((name, time.perf_counter() - self.__started, 0.0))
+
+    def report(self, imports: int = 15) -> None:
+        """
+        Logs the phases, and the slowest imports, then stops timing imports.
+        :param imports: The number of imports to report.
+        """
+        if not self.enabled:
+            return
+
+        self.enabled = False
+        builtins.__import__ = self.__import
+
+        log.info("Start-up profile:")
+        for name, at, elapsed in self.__phases:
+            log.info("  {0:>8.1f} ms  {1:>8.1f} ms  {2}".format(at * 1000, elapsed * 1000, name))
+
+        log.info("Slowest imports:")
+        for name, elapsed in sorted(self.__imports.items(), key=lambda item: item[1], reverse=True)[:imports]:
+            log.info("  {0:>8.1f} ms  {1}".format(elapsed * 1000, name))
+
+    def __timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        """Imports a module, timing it if it is the first import of a module not already loaded."""
+        if level != 0 or name in sys.modules or getattr(self.__nested, "active", False):
+            return self.__import(name, globals, locals, fromlist, level)
+
+        # Only the outermost import is timed, it includes the time of any modules it imports.
+        self.__nested.active = True
+        started = time.perf_counter()
+        try:
+            return self.__import(name, globals, locals, fromlist, level)
+        finally:
+            self.__nested.active = False
+            self.__imports[name] = self.__imports.get(name, 0.0) + time.perf_counter() - started
+
+
+# The start-up profile.
+profile = _StartupProfile()
@@ -1,11 +1,11 @@
-from typing import Any, Callable
+from typing import Any, Callable, Tuple
 import os
 import sys
 import logging
 import logging.handlers
+import functools
 
 import configparser
-from distutils.version import StrictVersion as Version
 
 # noinspection PyUnresolvedReferences
 import __main__ as program
@@ -25,6 +25,37 @@ class _StandardErrorFilter(logging.Filter):
         return super().filter(record) and logging.WARN <= record.levelno
 
 
+@functools.total_ordering
+class Version:
+    """A `major.minor[.patch]` version number, much lighter to import than distutils."""
+
+    def __init__(self, version: str):
+        """
+        Initializes a new instance of the Version class.
+        :param version: The version string.
+        """
+        parts = version.strip().split(".")
+        if not 2 <= len(parts) <= 3 or not all(part.isdigit() for part in parts):
+            raise ValueError("Invalid version number `{0}`".format(version))
+
+        self.parts = tuple(int(part) for part in parts) + (0,) * (3 - len(parts))  # type: Tuple[int, int, int]
+
+    def __str__(self) -> str:
+        return ".".join(str(part) for part in self.parts)
+
+    def __repr__(self) -> str:
+        return "Version('{0}')".format(self)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Version) and self.parts == other.parts
+
+    def __lt__(self, other) -> bool:
+        return self.parts < other.parts
+
+    def __hash__(self) -> int:
+        return hash(self.parts)
+
+
 class State:
     """Contains state data for the program."""
 
@@ -54,8 +85,11 @@ class State:
         # Path for the state data.
         self.__state_file_path = os.path.join(xdg_config_home, self.my_base, "state.ini")
 
+        # Path for cached data, such as rendered images.
+        self.cache_dir = os.path.join(xdg_cache_home, self.my_base)
+
         # Path for storing log files.
-        self.__log_file_path = os.path.join(xdg_cache_home, self.my_base, "user.log")
+        self.__log_file_path = os.path.join(self.cache_dir, "user.log")
         os.makedirs(os.path.dirname(self.__log_file_path), exist_ok=True)
 
         # Path for the configuration file.
@@ -78,6 +112,7 @@ class State:
 
         # Default values
         self.last_setup_version = Version("0.0.0")
+        self.dependency_fingerprint = ""
 
         self.__config = configparser.ConfigParser()
 
@@ -129,6 +164,8 @@ class State:
         """Reads the values from `state.ini` data."""
         self.last_setup_version = self.__get("General", "last setup version", True,
                                              self.last_setup_version, lambda value: Version(value))
+        self.dependency_fingerprint = self.__get("General", "dependency fingerprint", True,
+                                                 self.dependency_fingerprint)
 
     def __write(self):
         """Writes values to `state.ini` data."""
@@ -136,6 +173,7 @@ class State:
         self.__config.add_section("General")
         self.__config.set("General", "last setup version", str(self.last_setup_version))
         self.__config.set("General", "config file path", str(self.config_file_path))
+        self.__config.set("General", "dependency fingerprint", str(self.dependency_fingerprint))
 
     def __get(self, section: str, key: str, raw: bool, base: Any, convert: Callable[[Any], Any] = lambda value: value):
         """
@@ -152,5 +190,5 @@ class State:
             return convert(self.__config.get(section, key, raw=raw))
         except IOError:
             return base
-        except configparser.Error:
+        except (configparser.Error, ValueError):
             return base
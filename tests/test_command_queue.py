@@ -0,0 +1,86 @@
+from typing import Any, List
+import threading
+import unittest
+
+from app.support.CommandQueue import CommandQueue
+
+
+class CommandQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.batches = []  # type: List[List[Any]]
+        self.queue = CommandQueue("test", self.batches.append)
+        self.release = threading.Event()
+
+        # Hold the worker, so the commands submitted by the test wait together.
+        self.holding = self.queue.submit('hold', lambda: self.release.wait(1))
+
+    def tearDown(self):
+        self.release.set()
+        self.queue.stop()
+
+    def test_waiting_command_is_superseded_by_one_with_the_same_key(self):
+        first = self.queue.submit('power', lambda: 'on')
+        second = self.queue.submit('power', lambda: 'off')
+        other = self.queue.submit('input', lambda: 'input')
+        self.release.set()
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(second.result(1), 'off')
+        self.assertEqual(other.result(1), 'input')
+
+    def test_commands_run_in_order(self):
+        ran = []  # type: List[str]
+        futures = [self.queue.submit(key, lambda key=key: ran.append(key)) for key in ('a', 'b', 'c')]
+        self.release.set()
+
+        for future in futures:
+            future.result(1)
+        self.assertEqual(ran, ['a', 'b', 'c'])
+
+    def test_waiting_items_are_batched_together(self):
+        first = self.queue.submit_batched([(('tie', 1), 'tie 1'), (('tie', 2), 'tie 2')])
+        second = self.queue.submit_batched([(('tie', 1), 'tie 1 again'), (('tie', 3), 'tie 3')])
+        self.release.set()
+
+        for future in first[1:] + second:
+            future.result(1)
+        self.assertTrue(first[0].cancelled())
+        self.assertEqual(self.batches, [['tie 2', 'tie 1 again', 'tie 3']])
+
+    def test_command_splits_batches(self):
+        first = self.queue.submit_batched([(('tie', 1), 'tie 1')])
+        command = self.queue.submit('power', lambda: 'on')
+        second = self.queue.submit_batched([(('tie', 2), 'tie 2')])
+        self.release.set()
+
+        for future in first + [command] + second:
+            future.result(1)
+        self.assertEqual(self.batches, [['tie 1'], ['tie 2']])
+
+    def test_batch_error_fails_every_item(self):
+        def fail(items: List[Any]) -> None:
+            raise ValueError("failed")
+
+        queue = CommandQueue("failing", fail)
+        futures = queue.submit_batched([(('tie', 1), 'tie 1'), (('tie', 2), 'tie 2')])
+        for future in futures:
+            self.assertRaises(ValueError, future.result, 1)
+        queue.stop()
+
+    def test_queued_commands_run_before_stopping(self):
+        queued = self.queue.submit('power', lambda: 'on')
+        self.queue.stop()
+        self.release.set()
+
+        self.assertEqual(queued.result(1), 'on')
+
+    def test_submitting_after_stop_fails(self):
+        self.queue.stop()
+
+        self.assertRaises(RuntimeError, self.queue.submit('power', lambda: 'on').result, 1)
+        for future in self.queue.submit_batched([(('tie', 1), 'tie 1')]):
+            self.assertRaises(RuntimeError, future.result, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+from typing import List
+from unittest import mock
+import queue
+import time
+import unittest
+
+from app.support.drivers.libraries.extron_sis.channel import SisChannel
+from app.support.drivers.libraries.extron_sis.protocol import SisReplyError
+from app.support.drivers.libraries.extron_sis.session import SisSession
+from simulator import PtySimulator, TcpSimulator
+from simulator.extron import ExtronEngine
+
+
+class _Connection:
+    """An in-memory connection, the test plays the switch."""
+
+    def __init__(self):
+        self.written = []  # type: List[bytes]
+        self.__incoming = queue.Queue()  # type: queue.Queue
+
+    def reply(self, data: bytes) -> None:
+        self.__incoming.put(data)
+
+    def read(self) -> bytes:
+        try:
+            return self.__incoming.get(timeout=0.05)
+        except queue.Empty:
+            return b''
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+
+class _SlowExtronEngine(ExtronEngine):
+    """An Extron switch that holds back the replies to its first command until they are too late."""
+
+    DELAY = 0.5
+
+    def __init__(self):
+        super().__init__(12, 8)
+        self.__delayed = False
+
+    def receive(self, data: bytes) -> bytes:
+        if not self.__delayed:
+            self.__delayed = True
+            time.sleep(_SlowExtronEngine.DELAY)
+
+        return super().receive(data)
+
+
+class SisChannelTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = _Connection()
+        self.channel = SisChannel("test", self.connection.read, self.connection.write)
+
+    def tearDown(self):
+        self.channel.close(True)
+
+    def test_replies_are_matched_in_the_order_written(self):
+        first = self.channel.submit(b"1*1%", 1)
+        second = self.channel.submit(b"2*1$\r\n2*1%", 2)
+        self.connection.reply(b"Out1 In1 Vid\r\nOut1 In2 ")
+        self.connection.reply(b"Aud\r\nOut1 In2 Vid\r\n")
+
+        self.assertEqual([reply.raw for reply in first.result(1)], [b"Out1 In1 Vid"])
+        self.assertEqual([reply.raw for reply in second.result(1)], [b"Out1 In2 Aud", b"Out1 In2 Vid"])
+        self.assertEqual(self.connection.written, [b"1*1%", b"2*1$\r\n2*1%"])
+
+    def test_error_reply_fails_only_its_command(self):
+        failed = self.channel.submit(b"99*1%", 1)
+        succeeded = self.channel.submit(b"1*1%", 1)
+        self.connection.reply(b"E01\r\nOut1 In1 Vid\r\n")
+
+        self.assertRaises(SisReplyError, failed.result, 1)
+        self.assertEqual([reply.raw for reply in succeeded.result(1)], [b"Out1 In1 Vid"])
+
+    def test_timeout_closes_the_channel(self):
+        self.assertRaises(TimeoutError, self.channel.send, b"1*1%", 1, 0.1)
+        self.assertTrue(self.channel.closed)
+
+        # A reply arriving late is never matched with a later command.
+        self.connection.reply(b"Out1 In1 Vid\r\n")
+        self.assertRaises(ConnectionAbortedError, self.channel.submit(b"2*1%", 1).result, 1)
+
+
+class SisSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.simulator = TcpSimulator(_SlowExtronEngine)
+        self.session = SisSession(self.simulator.host, self.simulator.port)
+
+    def tearDown(self):
+        self.session.close()
+        self.simulator.close()
+
+    def test_timeout_is_not_retried(self):
+        with mock.patch.object(SisSession, "TIMEOUT", _SlowExtronEngine.DELAY / 2):
+            self.assertRaises(TimeoutError, self.session.send, b"1*1%", 1)
+
+        # Sending the command again would have needed a new connection.
+        self.assertEqual(len(self.simulator.engines), 1)
+
+
+class ExtronSerialTest(unittest.TestCase):
+    def setUp(self):
+        # Only imported here, since the drivers need the serial library.
+        from app.support.drivers.Extron import Extron
+
+        self.simulator = PtySimulator(_SlowExtronEngine())
+        self.driver = Extron({"maxInputs": 12, "maxOutputs": 8, "tty": self.simulator.tty})
+        self.driver.open()
+
+    def tearDown(self):
+        self.driver.close()
+        self.simulator.close()
+
+    def test_late_replies_are_not_matched_with_the_next_command(self):
+        with mock.patch.object(SisChannel, "TIMEOUT", _SlowExtronEngine.DELAY / 2):
+            self.assertRaises(TimeoutError, self.driver.set_tie, 1, 1, 1)
+
+            # The late replies confirm input 1, so they would fail this tie if they were taken as its replies.
+            self.driver.set_tie(2, 1, 1)
+
+        self.assertEqual(self.simulator.engine.video[1], 2)
+        self.assertEqual(self.simulator.engine.audio[1], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
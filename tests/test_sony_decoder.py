@@ -0,0 +1,46 @@
+import unittest
+
+from app.support.drivers.libraries.sony_bvm_rs485.decoder import PacketDecoder
+from app.support.drivers.libraries.sony_bvm_rs485.protocol import Command, checksum, encode_command
+
+
+class PacketDecoderTest(unittest.TestCase):
+    def setUp(self):
+        self.decoder = PacketDecoder()
+        self.packet = encode_command(0x01, 0xC0, Command.SET_CHANNEL, 3)
+
+    def test_packet_is_decoded_from_chunks(self):
+        self.assertEqual(self.decoder.feed(self.packet[:2]), [])
+        blocks = self.decoder.feed(self.packet[2:])
+
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0].command, Command.SET_CHANNEL)
+        self.assertEqual(blocks[0].destination.address, 1)
+        self.assertEqual(blocks[0].arg0, 3)
+
+    def test_packet_with_unknown_address_kind_is_dropped(self):
+        # The destination, 0x20, is neither a monitor, a group, nor all monitors.
+        data = bytes.fromhex("200021000103")
+        blocks = self.decoder.feed(b"\x02\x06" + data + bytes([checksum(data)]) + self.packet)
+
+        self.assertEqual(self.decoder.invalid_blocks, 1)
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(blocks[0].command, Command.SET_CHANNEL)
+
+    def test_packet_with_bad_checksum_is_skipped(self):
+        corrupt = bytearray(self.packet)
+        corrupt[-1] = (corrupt[-1] + 1) & 0xFF
+        blocks = self.decoder.feed(bytes(corrupt) + self.packet)
+
+        self.assertEqual(self.decoder.checksum_errors, 1)
+        self.assertEqual(len(blocks), 1)
+
+    def test_oversized_packet_is_skipped_without_waiting(self):
+        blocks = self.decoder.feed(b"\x02\xF0" + self.packet)
+
+        self.assertEqual(self.decoder.skipped, 2)
+        self.assertEqual(len(blocks), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()